@@ -10,29 +10,37 @@ builds log ``needs_follow_up=false`` and newer builds log
 from __future__ import annotations
 
 import argparse
+import atexit
+import ctypes
+import ctypes.util
 from dataclasses import dataclass
 import json
 import os
 import re
+import select
 import signal
 import sqlite3
+import struct
 import subprocess
 import sys
 import time
 from pathlib import Path
 import threading
-from typing import Callable, Literal, Optional
+from typing import Callable, Literal, Optional, TextIO
 
 try:
     from watchdog.observers import Observer as _WatchdogObserver
     from watchdog.events import FileSystemEventHandler as _FSHandler
 
     class _WakeHandler(_FSHandler):
-        """Signal the main loop when a watched file is modified or created."""
+        """Signal the main loop when a watched file is modified or replaced."""
 
-        def __init__(self, wake: threading.Event, paths: set[str]):
+        def __init__(
+            self, wake: threading.Event, paths: set[str], replaced: threading.Event
+        ):
             self.wake = wake
             self.paths = paths
+            self.replaced = replaced
 
         def on_modified(self, event):
             if not event.is_directory and event.src_path in self.paths:
@@ -40,25 +48,202 @@ try:
 
         def on_created(self, event):
             if not event.is_directory and event.src_path in self.paths:
+                self.replaced.set()
+                self.wake.set()
+
+        def on_deleted(self, event):
+            self.on_created(event)
+
+        def on_moved(self, event):
+            if event.is_directory:
+                return
+            if event.src_path in self.paths or event.dest_path in self.paths:
+                self.replaced.set()
                 self.wake.set()
 except ImportError:
     _WatchdogObserver = None  # type: ignore[assignment,misc]
 
-EVENT_RE = re.compile(
-    r"session_loop\{thread_id=([0-9a-f\-]+)\}.*post sampling token usage "
-    r"turn_id=([^ ]+).*needs_follow_up=(true|false)"
-)
+try:
+    # google-re2 matches in linear time; the tail-loop patterns below use
+    # nothing it lacks, so it is a drop-in when installed.
+    import re2 as _line_re
+    _LINE_RE_FLAGS = 0
+except ImportError:
+    _line_re = re
+    # Thread/turn ids and markers are ASCII; skip Unicode class tables.
+    _LINE_RE_FLAGS = re.ASCII
+
+
+_IN_MODIFY = 0x00000002
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+# Events that mean the path now names a different file (or none): rotation.
+_IN_REPLACED = _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _load_libc_inotify():
+    """Return libc with inotify symbols, or None off Linux / without libc."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class _InotifyObserver(threading.Thread):
+    """Stdlib inotify fallback for when watchdog is not installed.
+
+    Mirrors the small part of the watchdog ``Observer`` API used by ``main``:
+    watch directories and set *wake* when a file in *paths* is written, and
+    also *replaced* when it is created, renamed or deleted, so the main loop
+    blocks instead of polling once per second and notices rotation at once.
+    """
+
+    def __init__(
+        self,
+        libc,
+        fd: int,
+        wake: threading.Event,
+        paths: set[str],
+        replaced: threading.Event,
+    ):
+        super().__init__(name="acw-inotify", daemon=True)
+        self._libc = libc
+        self._fd = fd
+        # stop() writes here to end the blocking read loop.
+        self._stop_r, self._stop_w = os.pipe2(os.O_CLOEXEC)
+        self._dirs: dict[int, str] = {}
+        self._acw_handler = None
+        self.wake = wake
+        self.paths = paths
+        self.replaced = replaced
+
+    @classmethod
+    def create(
+        cls, wake: threading.Event, paths: set[str], replaced: threading.Event
+    ) -> Optional["_InotifyObserver"]:
+        libc = _load_libc_inotify()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        return cls(libc, fd, wake, paths, replaced)
+
+    def schedule(self, _handler, path: str, recursive: bool = False) -> None:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), _IN_MODIFY | _IN_REPLACED
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        self._dirs[wd] = path
+
+    def stop(self) -> None:
+        try:
+            os.write(self._stop_w, b"x")
+        except OSError:
+            pass
+
+    def run(self) -> None:
+        try:
+            self._read_events()
+        finally:
+            for fd in (self._fd, self._stop_r, self._stop_w):
+                os.close(fd)
 
-TASK_CLOSE_RE = re.compile(
-    r'session_loop\{thread_id=([0-9a-f\-]+)\}.*'
-    r'turn\{[^}]*turn.id=([^ ]+)[^}]*\}: codex_core::tasks: close\b'
+    def _read_events(self) -> None:
+        while True:
+            try:
+                ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+                if self._stop_r in ready:
+                    return
+                data = os.read(self._fd, 64 * 1024)
+            except InterruptedError:
+                continue
+            except OSError:
+                return
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                wd, mask, _cookie, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+                if mask & _IN_Q_OVERFLOW:
+                    # Events were dropped, possibly a rotation: have the main
+                    # loop re-stat the log and read whatever is there.
+                    self.replaced.set()
+                    self.wake.set()
+                    continue
+                dir_str = self._dirs.get(wd)
+                if dir_str and os.path.join(dir_str, os.fsdecode(name)) in self.paths:
+                    if mask & _IN_REPLACED:
+                        self.replaced.set()
+                    self.wake.set()
+
+
+def _start_file_observer(
+    wake: threading.Event, paths: set[str], replaced: threading.Event
+):
+    """Start a file-change observer (watchdog, then raw inotify), or None."""
+    if _WatchdogObserver is not None:
+        observer = _WatchdogObserver()
+        observer.daemon = True
+        observer._acw_handler = _WakeHandler(wake, paths, replaced)
+        observer.start()
+        return observer
+    observer = _InotifyObserver.create(wake, paths, replaced)
+    if observer is not None:
+        observer.start()
+    return observer
+
+# Both patterns start at the ``session_loop{`` span prefix. Callers find that
+# prefix with ``str.find`` and ``match`` from there, so the regex engine never
+# retries the pattern at every offset of the timestamp/level prefix, and the
+# lazy ``[^\n]*?`` gaps scan forward instead of backtracking from the end of
+# long lines. The flat ``post sampling token usage`` line and the bare thread
+# span are sliced with ``str.find`` instead (see ``_span_thread_id``).
+TASK_CLOSE_RE = _line_re.compile(
+    r'session_loop\{thread_id=([0-9a-f\-]+)\}[^\n]*?'
+    r'turn\{[^}]*turn\.id=([^ }]+)[^}]*\}: codex_core::tasks: close\b',
+    _LINE_RE_FLAGS,
 )
 
-INTERRUPT_RE = re.compile(
-    r"session_loop\{thread_id=([0-9a-f\-]+)\}.*"
-    r"codex_core::codex: interrupt received: abort current task, if any\b"
+INTERRUPT_RE = _line_re.compile(
+    r"session_loop\{thread_id=([0-9a-f\-]+)\}[^\n]*?"
+    r"codex_core::codex: interrupt received: abort current task, if any\b",
+    _LINE_RE_FLAGS,
 )
 
+# Literal substrings that every parsed line must contain.
+# ``in`` rejects the (overwhelmingly common) non-event lines far faster than
+# running the regex engine over them.
+SESSION_LOOP_MARKER = "session_loop{"
+EVENT_MARKER = "post sampling token usage"
+EVENT_TURN_PREFIX = EVENT_MARKER + " turn_id="
+FOLLOW_UP_PREFIX = "needs_follow_up="
+THREAD_SPAN_PREFIX = "session_loop{thread_id="
+TASK_CLOSE_MARKER = "codex_core::tasks: close"
+INTERRUPT_MARKER = "interrupt received"
+# Byte forms for the tail loop, which only decodes lines that contain one.
+SESSION_LOOP_MARKER_BYTES = SESSION_LOOP_MARKER.encode()
+EVENT_MARKER_BYTES = EVENT_MARKER.encode()
+TASK_CLOSE_MARKER_BYTES = TASK_CLOSE_MARKER.encode()
+INTERRUPT_MARKER_BYTES = INTERRUPT_MARKER.encode()
+
+# Bound ``match`` methods for the per-line tail path; skips the global +
+# attribute lookup on every log line.
+_task_close_match = TASK_CLOSE_RE.match
+_interrupt_match = INTERRUPT_RE.match
+
 STATE_DIR = Path.home() / ".codex"
 
 
@@ -69,22 +254,26 @@ THREAD_ID_RE = re.compile(
     r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
 )
 
-THREAD_LINE_RE = re.compile(r"session_loop\{thread_id=([0-9a-f\-]+)\}")
+_THREAD_SPAN_CHARS = frozenset("0123456789abcdef-")
 
 def is_thread_id(s: str) -> bool:
     return bool(THREAD_ID_RE.fullmatch(s))
 
 HEALTH_CHECK_INTERVAL = 30.0   # seconds between periodic health checks
 STARTUP_GRACE_SECS = 60.0
+ROTATION_CHECK_SECS = 2.0      # min seconds between idle rotation/truncation stats
+POLL_MIN_SECS = 0.05           # poll interval while the log is active (no file observer)
+POLL_MAX_SECS = 1.0            # poll interval once the log has gone idle (no file observer)
+CODEX_READ_CHUNK = 64 * 1024   # bytes per read() of codex-tui.log
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TmuxSendResult:
     status: Literal["ok", "error", "interrupted"]
     detail: str = ""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CodexLogEvent:
     kind: Literal["completion", "interrupt"]
     thread_id: str
@@ -92,26 +281,167 @@ class CodexLogEvent:
     detail: str = ""
 
 
+def _span_thread_id(line: str, start: int) -> tuple[Optional[str], int]:
+    """Slice the id out of a ``session_loop{thread_id=...}`` span at *start*.
+
+    Returns ``(thread_id, end)`` where *end* is the index of the closing
+    brace, or ``(None, -1)`` if the span is malformed.
+    """
+    if not line.startswith(THREAD_SPAN_PREFIX, start):
+        return None, -1
+    begin = start + len(THREAD_SPAN_PREFIX)
+    end = line.find("}", begin)
+    if end <= begin:
+        return None, -1
+    thread_id = line[begin:end]
+    if not _THREAD_SPAN_CHARS.issuperset(thread_id):
+        return None, -1
+    return thread_id, end
+
+
+def _parse_post_sampling(line: str, start: int) -> Optional[tuple[str, str, str]]:
+    """Parse ``... post sampling token usage turn_id=T ... needs_follow_up=B``."""
+    thread_id, end = _span_thread_id(line, start)
+    if thread_id is None:
+        return None
+    i = line.find(EVENT_TURN_PREFIX, end)
+    if i < 0:
+        return None
+    i += len(EVENT_TURN_PREFIX)
+    j = line.find(" ", i)
+    if j <= i:
+        return None
+    k = line.find(FOLLOW_UP_PREFIX, j)
+    while k >= 0:
+        k += len(FOLLOW_UP_PREFIX)
+        if line.startswith("false", k):
+            return thread_id, line[i:j], "false"
+        if line.startswith("true", k):
+            return thread_id, line[i:j], "true"
+        k = line.find(FOLLOW_UP_PREFIX, k)
+    return None
+
+
+def coalesce_completions(events: list[CodexLogEvent]) -> list[CodexLogEvent]:
+    """Drop completions superseded later in the same batch.
+
+    Of several ``needs_follow_up=false`` completions for one thread read in a
+    single wakeup, only the last one can still be waiting for input, so only
+    it is kept and at most one continue is sent. An interrupt for the thread
+    ends the run, so a completion before it is still seen (and skipped) in
+    order.
+    """
+    kept: list[Optional[CodexLogEvent]] = []
+    latest: dict[str, int] = {}
+    for event in events:
+        if event.kind == "interrupt":
+            latest.pop(event.thread_id, None)
+        elif event.detail == "false":
+            prev = latest.get(event.thread_id)
+            if prev is not None:
+                kept[prev] = None
+            latest[event.thread_id] = len(kept)
+        kept.append(event)
+    return [event for event in kept if event is not None]
+
+
 def parse_codex_log_event(line: str) -> Optional[tuple[str, str, str]]:
     """Return a normalized completion event from codex-tui.log."""
-    m = EVENT_RE.search(line)
-    if m:
-        return m.group(1), m.group(2), m.group(3)
+    start = line.find(SESSION_LOOP_MARKER)
+    if start < 0:
+        return None
 
-    m = TASK_CLOSE_RE.search(line)
-    if m:
-        return m.group(1), m.group(2), "false"
+    if EVENT_MARKER in line:
+        event = _parse_post_sampling(line, start)
+        if event:
+            return event
+
+    if TASK_CLOSE_MARKER in line:
+        m = _task_close_match(line, start)
+        if m:
+            return m.group(1), m.group(2), "false"
 
     return None
 
 
 def parse_codex_log_interrupt(line: str) -> Optional[str]:
-    m = INTERRUPT_RE.search(line)
+    if INTERRUPT_MARKER not in line:
+        return None
+    start = line.find(SESSION_LOOP_MARKER)
+    if start < 0:
+        return None
+    m = _interrupt_match(line, start)
     if not m:
         return None
     return m.group(1)
 
 
+def check_log_rotation(
+    path: Path, fh, ino: int, last_check: float, now: float
+) -> tuple[str, float]:
+    """Stat *path* to see whether the open log *fh* (inode *ino*) went stale.
+
+    Returns ``(verdict, last_check)``. The verdict is ``"deferred"`` when the
+    previous stat was less than ROTATION_CHECK_SECS before *now* (the caller
+    must check again once that has passed), ``"gone"`` when *path* no longer
+    exists, ``"replaced"`` for a new inode or a truncation below our offset,
+    and ``"same"`` otherwise.
+    """
+    if now - last_check <= ROTATION_CHECK_SECS:
+        return "deferred", last_check
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "gone", now
+    if st.st_ino != ino or st.st_size < fh.tell():
+        return "replaced", now
+    return "same", now
+
+
+def read_complete_lines(
+    fh, pending: bytes, marker: bytes = b""
+) -> tuple[list[bytes], bytes, bool]:
+    """Drain *fh* (opened ``rb``, unbuffered) in large chunks.
+
+    Returns ``(lines, pending, read_any)``: the newly completed lines (still
+    undecoded), the trailing partial line to carry into the next call, and
+    whether anything was read. Each chunk costs one ``read`` syscall rather
+    than one ``readline`` per line (a typical wakeup is a single short
+    read), and a line still being written is held back until its newline
+    arrives instead of being parsed half-finished.
+
+    With *marker*, only lines containing it are returned. They are located
+    with ``bytes.find`` over the whole chunk, so the other lines are never
+    split out or copied.
+    """
+    lines: list[bytes] = []
+    read_any = False
+    chunk = fh.read(CODEX_READ_CHUNK)
+    while chunk:
+        read_any = True
+        data = pending + chunk
+        end = data.rfind(b"\n")
+        if end < 0:
+            pending = data
+        else:
+            pending = data[end + 1:]
+            if not marker:
+                lines.extend(data[:end].split(b"\n"))
+            else:
+                i = data.find(marker, 0, end)
+                while i >= 0:
+                    start = data.rfind(b"\n", 0, i) + 1
+                    stop = data.find(b"\n", i)
+                    lines.append(data[start:stop])
+                    i = data.find(marker, stop, end)
+        # A short read means we hit EOF; skip the empty read that would
+        # only confirm it. Anything appended meanwhile wakes us again.
+        if len(chunk) < CODEX_READ_CHUNK:
+            break
+        chunk = fh.read(CODEX_READ_CHUNK)
+    return lines, pending, read_any
+
+
 def compute_health(
     *,
     watched_thread: str,
@@ -130,10 +460,35 @@ def compute_health(
 
 
 def _thread_id_from_codex_log_line(line: str) -> Optional[str]:
-    m = THREAD_LINE_RE.search(line)
-    if not m:
+    start = line.find(SESSION_LOOP_MARKER)
+    if start < 0:
         return None
-    return m.group(1).lower()
+    thread_id, _ = _span_thread_id(line, start)
+    if thread_id is None:
+        return None
+    return thread_id.lower()
+
+
+def _iter_lines_reversed(f, file_size: int, max_bytes: int):
+    """Yield the undecoded lines of binary file *f*, last line first.
+
+    Reads backwards in ``CODEX_READ_CHUNK`` blocks and stops after the final
+    *max_bytes*, so a caller that finds what it needs near the end never
+    reads the rest of the window.
+    """
+    floor = max(0, file_size - max_bytes)
+    pos = file_size
+    carry = b""
+    while pos > floor:
+        step = min(CODEX_READ_CHUNK, pos - floor)
+        pos -= step
+        f.seek(pos)
+        parts = (f.read(step) + carry).split(b"\n")
+        carry = parts[0]
+        for raw in reversed(parts[1:]):
+            yield raw
+    if carry:
+        yield carry
 
 
 def check_codex_log_tail_for_pending(
@@ -151,49 +506,365 @@ def check_codex_log_tail_for_pending(
     if file_size == 0:
         return None
 
-    tail_bytes = min(file_size, 2 * 1024 * 1024)
+    # Any line whose session span is the watched thread contains this.
+    needle = f"{THREAD_SPAN_PREFIX}{watched_thread}}}".encode()
     try:
         with log_path.open("rb") as f:
-            if tail_bytes < file_size:
-                f.seek(-tail_bytes, os.SEEK_END)
-            tail = f.read().decode("utf-8", errors="ignore")
+            for raw in _iter_lines_reversed(f, file_size, 2 * 1024 * 1024):
+                if needle not in raw:
+                    continue
+                line = raw.decode("utf-8", errors="ignore")
+                thread_id = _thread_id_from_codex_log_line(line)
+                if thread_id != watched_thread:
+                    continue
+                event = parse_codex_log_event(line)
+                if not event:
+                    return None
+                _, turn_id, needs_follow_up = event
+                if needs_follow_up != "false":
+                    return None
+                if turn_id == last_sent_turn and watched_thread == last_sent_thread:
+                    return None
+                append_log(
+                    watch_log,
+                    f"startup: found pending completion turn={turn_id}",
+                )
+                return (watched_thread, turn_id, "false")
     except OSError:
         return None
-
-    for line in reversed(tail.splitlines()):
-        thread_id = _thread_id_from_codex_log_line(line)
-        if thread_id != watched_thread:
-            continue
-        event = parse_codex_log_event(line)
-        if not event:
-            return None
-        _, turn_id, needs_follow_up = event
-        if needs_follow_up != "false":
-            return None
-        if turn_id == last_sent_turn and watched_thread == last_sent_thread:
-            return None
-        append_log(
-            watch_log,
-            f"startup: found pending completion turn={turn_id}",
-        )
-        return (watched_thread, turn_id, "false")
     return None
 
 
+# (epoch second, formatted) of the last now_ts() call; log lines written in
+# the same second reuse the string instead of calling strftime again.
+_NOW_TS_CACHE: tuple[int, str] = (-1, "")
+
+
 def now_ts() -> str:
-    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    global _NOW_TS_CACHE
+    sec = int(time.time())
+    if sec != _NOW_TS_CACHE[0]:
+        _NOW_TS_CACHE = (sec, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(sec)))
+    return _NOW_TS_CACHE[1]
+
+
+# Watch logs stay open for the life of the watcher. Line buffering keeps each
+# entry visible to ``acw status`` immediately while avoiding an
+# open/write/close cycle (plus a parent mkdir) per message.
+_LOG_HANDLES: dict[Path, TextIO] = {}
+
+
+def _close_log_handles() -> None:
+    for fh in _LOG_HANDLES.values():
+        try:
+            fh.close()
+        except OSError:
+            pass
+    _LOG_HANDLES.clear()
+
+
+atexit.register(_close_log_handles)
+
+
+def _reopen_unlinked_log_handles() -> None:
+    """Drop cached handles whose file was deleted, e.g. by ``acw cleanup``.
+
+    Writes to an unlinked file succeed but are never seen again, so the next
+    ``append_log`` recreates the log at its path instead.
+    """
+    for log_file, fh in list(_LOG_HANDLES.items()):
+        try:
+            unlinked = os.fstat(fh.fileno()).st_nlink == 0
+        except (OSError, ValueError):
+            unlinked = True
+        if unlinked:
+            _LOG_HANDLES.pop(log_file, None)
+            try:
+                fh.close()
+            except OSError:
+                pass
 
 
 def append_log(log_file: Path, msg: str) -> None:
+    fh = _LOG_HANDLES.get(log_file)
     try:
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        with log_file.open("a", encoding="utf-8") as f:
-            f.write(f"[{now_ts()}] {msg}\n")
+        if fh is None:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            fh = log_file.open("a", encoding="utf-8", buffering=1)
+            _LOG_HANDLES[log_file] = fh
+        fh.write(f"[{now_ts()}] {msg}\n")
     except OSError:
-        pass  # disk full / read-only — keep running
+        # disk full / read-only — keep running, and reopen on the next write.
+        if fh is not None:
+            _LOG_HANDLES.pop(log_file, None)
+            try:
+                fh.close()
+            except OSError:
+                pass
+
+
+def _split_tmux_argv(args: list[str]) -> list[list[str]]:
+    """Split tmux argv into commands, following tmux's own ``;`` rules.
+
+    On the command line a word ending in ``;`` ends a command, and ``\\;``
+    keeps a literal trailing ``;``.
+    """
+    commands: list[list[str]] = []
+    current: list[str] = []
+    for arg in args:
+        if arg.endswith(";"):
+            if arg.endswith("\\;"):
+                current.append(arg[:-2] + ";")
+                continue
+            if arg[:-1]:
+                current.append(arg[:-1])
+            if current:
+                commands.append(current)
+            current = []
+            continue
+        current.append(arg)
+    if current:
+        commands.append(current)
+    return commands
+
+
+def _tmux_control_quote(arg: str) -> str:
+    """Quote one argument for a tmux control-mode command line."""
+    out = ['"']
+    for ch in arg:
+        if ch in '\\"$':
+            out.append("\\" + ch)
+        elif ch == "\n":
+            out.append("\\n")
+        elif ch == "\r":
+            out.append("\\r")
+        elif ch == "\t":
+            out.append("\\t")
+        elif ch < " " or ch == "\x7f":
+            out.append(f"\\{ord(ch):03o}")
+        else:
+            out.append(ch)
+    out.append('"')
+    return "".join(out)
+
+
+class TmuxControl:
+    """Long-lived ``tmux -C`` client used by ``run_tmux`` while it is healthy.
+
+    Each tmux command is written as one line to the control client and its
+    result is read back from the ``%begin``/``%end`` (or ``%error``) frame, so
+    the watcher's steady-state tmux calls cost a pipe round-trip instead of a
+    fork+exec of the tmux binary. Any transport failure returns None and the
+    caller falls back to spawning tmux.
+    """
+
+    TIMEOUT_SECS = 5.0
+
+    def __init__(self, proc: subprocess.Popen):
+        self._proc = proc
+        self._buf = b""
+
+    @classmethod
+    def open(cls, target: str, socket_path: str = "") -> Optional["TmuxControl"]:
+        """Attach a control client to the session holding pane *target*.
+
+        The client attaches by ``#{session_id}``, not by pane: attaching to a
+        pane target makes tmux select that window and pane in the session,
+        which would yank an attached user onto the watched window at every
+        (re-)attach. Commands still name ``-t <pane>`` explicitly. The client
+        does count as an attached client, so ``client-attached`` and
+        ``client-detached`` hooks fire when it comes and goes.
+        """
+        cmd = ["tmux"]
+        if socket_path:
+            cmd.extend(["-S", socket_path])
+        try:
+            resolved = subprocess.run(
+                cmd + ["display-message", "-p", "-t", target, "#{session_id}"],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except OSError:
+            return None
+        session_id = resolved.stdout.strip()
+        if resolved.returncode != 0 or not session_id.startswith("$"):
+            return None
+        # ignore-size keeps the control client from resizing the user's
+        # windows; no-output suppresses %output notifications we never read.
+        cmd.extend(["-C", "attach-session", "-f", "ignore-size,no-output", "-t", session_id])
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+        control = cls(proc)
+        probe = control.run(["display-message", "-p", "-t", target, "#{pane_id}"])
+        if probe is None or probe.returncode != 0:
+            control.close()
+            return None
+        return control
+
+    def close(self) -> None:
+        try:
+            if self._proc.stdin:
+                self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+        if self._proc.stdout:
+            self._proc.stdout.close()
+
+    def _readline(self, deadline: float) -> Optional[str]:
+        fd = self._proc.stdout.fileno()
+        while b"\n" not in self._buf:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(fd, 64 * 1024)
+            if not chunk:
+                return None
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        return line.decode("utf-8", errors="replace")
+
+    def _run_one(self, args: list[str], deadline: float) -> Optional[tuple[bool, str]]:
+        line = " ".join(_tmux_control_quote(arg) for arg in args) + "\n"
+        try:
+            self._proc.stdin.write(line.encode("utf-8"))
+            self._proc.stdin.flush()
+        except (OSError, ValueError):
+            return None
+
+        block: Optional[list[str]] = None
+        number = ""
+        ours = False
+        while True:
+            text = self._readline(deadline)
+            if text is None:
+                return None
+            if block is None:
+                # Skip notifications between frames.
+                if text.startswith("%begin "):
+                    parts = text.split(" ")
+                    block = []
+                    number = parts[2] if len(parts) == 4 else ""
+                    # Flag 1 marks output of a command sent by this client.
+                    ours = len(parts) == 4 and parts[3] == "1"
+                elif text.startswith("%exit"):
+                    return None
+                continue
+            if text.startswith(("%end ", "%error ")):
+                parts = text.split(" ")
+                if len(parts) == 4 and parts[2] == number:
+                    if ours:
+                        output = "".join(f"{ln}\n" for ln in block)
+                        return text.startswith("%end "), output
+                    block = None
+                    continue
+            block.append(text)
+
+    def run(self, args: list[str]) -> Optional[subprocess.CompletedProcess]:
+        """Run tmux *args* over the control client, or None if it is unusable."""
+        deadline = time.monotonic() + self.TIMEOUT_SECS
+        stdout: list[str] = []
+        for command in _split_tmux_argv(args):
+            result = self._run_one(command, deadline)
+            if result is None:
+                return None
+            ok, output = result
+            if not ok:
+                # Like the tmux CLI, stop at the first failing command.
+                return subprocess.CompletedProcess(args, 1, "".join(stdout), output)
+            stdout.append(output)
+        return subprocess.CompletedProcess(args, 0, "".join(stdout), "")
+
+
+TMUX_CONTROL_RETRY_SECS = 30.0
+_TMUX_CONTROL: Optional[TmuxControl] = None
+# Target to re-attach to after the control client drops, and when to try next.
+_TMUX_CONTROL_TARGET = ""
+_TMUX_CONTROL_RETRY_AT = 0.0
+
+
+def start_tmux_control(target: str) -> bool:
+    """Route later ``run_tmux`` calls through a control client attached to *target*."""
+    global _TMUX_CONTROL, _TMUX_CONTROL_TARGET, _TMUX_CONTROL_RETRY_AT
+    if _TMUX_CONTROL is not None:
+        return True
+    _TMUX_CONTROL_TARGET = target
+    _TMUX_CONTROL_RETRY_AT = time.monotonic() + TMUX_CONTROL_RETRY_SECS
+    _TMUX_CONTROL = TmuxControl.open(target, os.environ.get("AUTO_CONTINUE_TMUX_SOCKET", ""))
+    return _TMUX_CONTROL is not None
+
+
+def stop_tmux_control() -> None:
+    global _TMUX_CONTROL, _TMUX_CONTROL_TARGET
+    _TMUX_CONTROL_TARGET = ""
+    control, _TMUX_CONTROL = _TMUX_CONTROL, None
+    if control is not None:
+        control.close()
+
+
+def _drop_tmux_control() -> None:
+    """Close a failed control client but keep its target for a later re-attach."""
+    global _TMUX_CONTROL, _TMUX_CONTROL_RETRY_AT
+    control, _TMUX_CONTROL = _TMUX_CONTROL, None
+    _TMUX_CONTROL_RETRY_AT = time.monotonic() + TMUX_CONTROL_RETRY_SECS
+    if control is not None:
+        control.close()
+
+
+atexit.register(stop_tmux_control)
+
+# Environment for the default tmux server, kept once the explicit socket
+# could not be connected to and the default server answered. Until
+# _TMUX_FALLBACK_UNTIL, later calls go straight there instead of failing
+# against the dead socket first; after it the explicit socket is tried again.
+# An ordinary command failure (e.g. a pane that is gone) never switches servers.
+TMUX_FALLBACK_RETRY_SECS = 30.0
+_TMUX_FALLBACK_ENV: Optional[dict[str, str]] = None
+_TMUX_FALLBACK_UNTIL = 0.0
+_TMUX_CONNECT_ERRORS = ("no server running", "error connecting to")
 
 
 def run_tmux(args: list[str], *, capture_output: bool = True) -> subprocess.CompletedProcess:
+    if (
+        _TMUX_CONTROL is None
+        and _TMUX_CONTROL_TARGET
+        and time.monotonic() >= _TMUX_CONTROL_RETRY_AT
+    ):
+        # A dropped client (e.g. its session was killed after the pane moved)
+        # is re-attached at most once per TMUX_CONTROL_RETRY_SECS.
+        start_tmux_control(_TMUX_CONTROL_TARGET)
+    if _TMUX_CONTROL is not None:
+        rc = _TMUX_CONTROL.run(args)
+        if rc is not None:
+            return rc
+        # The control client died or stalled; spawn tmux until the next retry.
+        _drop_tmux_control()
+
+    global _TMUX_FALLBACK_ENV, _TMUX_FALLBACK_UNTIL
+    if _TMUX_FALLBACK_ENV is not None and time.monotonic() < _TMUX_FALLBACK_UNTIL:
+        return subprocess.run(
+            ["tmux", *args],
+            capture_output=capture_output,
+            text=True,
+            check=False,
+            env=_TMUX_FALLBACK_ENV,
+        )
+
     cmd = ["tmux"]
     socket_path = os.environ.get("AUTO_CONTINUE_TMUX_SOCKET", "")
     if socket_path:
@@ -206,20 +877,25 @@ def run_tmux(args: list[str], *, capture_output: bool = True) -> subprocess.Comp
         check=False,
     )
     if rc.returncode == 0:
+        _TMUX_FALLBACK_ENV = None
         return rc
 
     # Recover from stale socket state by retrying against the default server.
     if socket_path or os.environ.get("TMUX"):
-        env = os.environ.copy()
-        env.pop("TMUX", None)
-        env.pop("TMUX_PANE", None)
-        return subprocess.run(
+        env = {
+            k: v for k, v in os.environ.items() if k != "TMUX" and k != "TMUX_PANE"
+        }
+        fallback = subprocess.run(
             ["tmux", *args],
             capture_output=capture_output,
             text=True,
             check=False,
             env=env,
         )
+        if fallback.returncode == 0 and any(e in (rc.stderr or "") for e in _TMUX_CONNECT_ERRORS):
+            _TMUX_FALLBACK_ENV = env
+            _TMUX_FALLBACK_UNTIL = time.monotonic() + TMUX_FALLBACK_RETRY_SECS
+        return fallback
 
     return rc
 
@@ -229,7 +905,7 @@ PANE_INTERRUPT_PATTERNS = [
     re.compile(r"model interrupted to submit steer instructions", re.IGNORECASE),
 ]
 
-PROMPT_MARKER_RE = re.compile(r"(?m)^› ")
+PROMPT_MARKER = "› "
 
 
 PANE_ERROR_PATTERNS = [
@@ -251,9 +927,19 @@ def tmux_capture_pane(pane: str, lines: int = 20) -> str:
     return ""
 
 
-def _check_pane_for_patterns(pane: str, patterns: list[re.Pattern[str]]) -> Optional[str]:
-    text = tmux_capture_pane(pane, lines=20)
-    for pat in patterns:
+def _interrupt_in_pane_text(text: str) -> Optional[str]:
+    # Only text after the last line-leading prompt marker is fresh; search
+    # from there instead of matching banners in stale scrollback.
+    start = text.rfind("\n" + PROMPT_MARKER) + 1
+    for pat in PANE_INTERRUPT_PATTERNS:
+        m = pat.search(text, start)
+        if m:
+            return m.group(0)
+    return None
+
+
+def _error_in_pane_text(text: str) -> Optional[str]:
+    for pat in PANE_ERROR_PATTERNS:
         m = pat.search(text)
         if m:
             return m.group(0)
@@ -267,25 +953,26 @@ def check_pane_for_interrupt(pane: str) -> Optional[str]:
     Treat them as active only when they appear after the most recent visible
     prompt marker.
     """
-    text = tmux_capture_pane(pane, lines=20)
-    last_prompt = None
-    for match in PROMPT_MARKER_RE.finditer(text):
-        last_prompt = match.start()
-    for pat in PANE_INTERRUPT_PATTERNS:
-        m = pat.search(text)
-        if not m:
-            continue
-        if last_prompt is not None and m.start() < last_prompt:
-            continue
-        return m.group(0)
-    return None
+    return _interrupt_in_pane_text(tmux_capture_pane(pane, lines=20))
 
 
 def check_pane_for_errors(pane: str) -> Optional[str]:
     """Return the first matched non-interrupt error string from the pane, or None."""
-    if check_pane_for_interrupt(pane):
-        return None
-    return _check_pane_for_patterns(pane, PANE_ERROR_PATTERNS)
+    return check_pane(pane)[1]
+
+
+def check_pane(pane: str) -> tuple[Optional[str], Optional[str]]:
+    """Return ``(interrupt, error)`` banners from a single pane capture.
+
+    Equivalent to calling ``check_pane_for_interrupt`` then
+    ``check_pane_for_errors``, which between them captured the pane three
+    times; an active interrupt suppresses the error result.
+    """
+    text = tmux_capture_pane(pane, lines=20)
+    interrupt = _interrupt_in_pane_text(text)
+    if interrupt:
+        return interrupt, None
+    return None, _error_in_pane_text(text)
 
 
 def auto_pause_current_watcher(reason: str, watch_log: Path, state_file: Path, state: dict) -> None:
@@ -299,48 +986,67 @@ def auto_pause_current_watcher(reason: str, watch_log: Path, state_file: Path, s
     os.kill(os.getpid(), signal.SIGSTOP)
 
 
+PANE_STATUS_TTL_SECS = 0.5
+_PANE_STATUS_FIELDS = ("pane_id", "pane_active", "pane_pid", "window_index", "window_name", "pane_current_path")
+_PANE_STATUS_FORMAT = "\t".join(f"#{{{f}}}" for f in _PANE_STATUS_FIELDS)
+_PANE_STATUS_CACHE: dict[str, tuple[float, dict[str, str]]] = {}
+
+
+def tmux_pane_status(pane: str) -> dict[str, str]:
+    """Return *pane*'s tmux format fields from one display-message, or {}.
+
+    The result (including a failed lookup) is reused for PANE_STATUS_TTL_SECS
+    so the getters below share a single tmux call per burst.
+    """
+    now = time.monotonic()
+    cached = _PANE_STATUS_CACHE.get(pane)
+    if cached is not None and now - cached[0] < PANE_STATUS_TTL_SECS:
+        return cached[1]
+    status: dict[str, str] = {}
+    rc = run_tmux(["display-message", "-p", "-t", pane, _PANE_STATUS_FORMAT])
+    if rc.returncode == 0 and rc.stdout:
+        # pane_current_path comes last so maxsplit keeps any tab in the path.
+        values = rc.stdout.rstrip("\n").split("\t", len(_PANE_STATUS_FIELDS) - 1)
+        if len(values) == len(_PANE_STATUS_FIELDS):
+            status = dict(zip(_PANE_STATUS_FIELDS, values))
+    _PANE_STATUS_CACHE[pane] = (now, status)
+    return status
+
+
 def tmux_pane_exists(pane: str) -> bool:
-    rc = run_tmux(["display-message", "-p", "-t", pane, "#{pane_id}"])
-    return rc.returncode == 0
+    return bool(tmux_pane_status(pane))
 
 
 def tmux_window_name(pane: str) -> str:
     """Return the tmux window name for *pane*, or '' on failure."""
-    rc = run_tmux(["display-message", "-p", "-t", pane, "#{window_name}"])
-    if rc.returncode == 0 and rc.stdout:
-        return rc.stdout.strip()
-    return ""
+    return tmux_pane_status(pane).get("window_name", "").strip()
 
 
 def tmux_window_index(pane: str) -> str:
     """Return the tmux window index for *pane*, or '' on failure."""
-    rc = run_tmux(["display-message", "-p", "-t", pane, "#{window_index}"])
-    if rc.returncode == 0 and rc.stdout:
-        return rc.stdout.strip()
-    return ""
+    return tmux_pane_status(pane).get("window_index", "")
 
 
 def tmux_pane_cwd(pane: str) -> str:
     """Return the current working directory for *pane*, or '' on failure."""
-    rc = run_tmux(["display-message", "-p", "-t", pane, "#{pane_current_path}"])
-    if rc.returncode == 0 and rc.stdout:
-        return rc.stdout.strip()
-    return ""
+    return tmux_pane_status(pane).get("pane_current_path", "").strip()
 
 
 def tmux_pane_active(pane: str) -> bool:
-    rc = run_tmux(["display-message", "-p", "-t", pane, "#{pane_active}"])
-    return rc.returncode == 0 and rc.stdout.strip() == "1"
-
+    return tmux_pane_status(pane).get("pane_active") == "1"
 
-def tmux_pane_in_mode(pane: str) -> bool:
-    rc = run_tmux(["display-message", "-p", "-t", pane, "#{pane_in_mode}"])
-    return rc.returncode == 0 and rc.stdout.strip() == "1"
 
+def _tmux_leave_mode(pane: str) -> None:
+    """Leave copy/view mode first if *pane* is in one.
 
-def tmux_cancel_mode_if_needed(pane: str) -> None:
-    if tmux_pane_in_mode(pane):
-        run_tmux(["send-keys", "-t", pane, "-X", "cancel"], capture_output=False)
+    The mode is probed with its own display-message rather than an
+    ``if-shell -F`` in front of the send: the command if-shell queues gets a
+    ``%begin``/``%end`` frame of its own on the control client, which would
+    shift every later reply by one.
+    """
+    rc = run_tmux(["display-message", "-p", "-t", pane, "#{pane_in_mode}"])
+    if rc.returncode == 0 and rc.stdout.strip() == "1":
+        run_tmux(["send-keys", "-t", pane, "-X", "cancel"])
 
 
 def _interrupt_reason(
@@ -351,27 +1057,52 @@ def _interrupt_reason(
     return interrupt_checker()
 
 
+def _tmux_literal_arg(text: str) -> str:
+    """Escape *text* so tmux does not read a trailing ``;`` as a separator."""
+    if text.endswith(";"):
+        return text[:-1] + "\\;"
+    return text
+
+
+def _tmux_send_failure(label: str, rc: subprocess.CompletedProcess) -> TmuxSendResult:
+    detail_parts = [f"{label} rc={rc.returncode}"]
+    for stream_name, stream in (("stderr", rc.stderr), ("stdout", rc.stdout)):
+        text = (stream or "").strip()
+        if text:
+            detail_parts.append(f"{label} {stream_name}={text}")
+    return TmuxSendResult("error", "; ".join(detail_parts))
+
+
 def _tmux_send_once(
     pane: str,
     msg: str,
     enter_delay_secs: float,
     interrupt_checker: Optional[Callable[[], Optional[str]]] = None,
 ) -> TmuxSendResult:
-    send_text = run_tmux(["send-keys", "-t", pane, "-l", msg])
+    literal = _tmux_literal_arg(msg)
+    if enter_delay_secs <= 0.0:
+        # No pause is wanted between text and Enter, so check for an
+        # interrupt once up front and let a single tmux invocation run both
+        # send-keys commands.
+        reason = _interrupt_reason(interrupt_checker)
+        if reason:
+            return TmuxSendResult("interrupted", reason)
+        _tmux_leave_mode(pane)
+        send = run_tmux(["send-keys", "-t", pane, "-l", literal, ";", "send-keys", "-t", pane, "C-m"])
+        if send.returncode == 0:
+            return TmuxSendResult("ok")
+        return _tmux_send_failure("send", send)
+
+    _tmux_leave_mode(pane)
+    send_text = run_tmux(["send-keys", "-t", pane, "-l", literal])
     if send_text.returncode != 0:
-        detail_parts = [f"send-text rc={send_text.returncode}"]
-        for stream_name, stream in (("stderr", send_text.stderr), ("stdout", send_text.stdout)):
-            text = (stream or "").strip()
-            if text:
-                detail_parts.append(f"send-text {stream_name}={text}")
-        return TmuxSendResult("error", "; ".join(detail_parts))
+        return _tmux_send_failure("send-text", send_text)
 
     reason = _interrupt_reason(interrupt_checker)
     if reason:
         return TmuxSendResult("interrupted", reason)
 
-    if enter_delay_secs > 0.0:
-        time.sleep(enter_delay_secs)
+    time.sleep(enter_delay_secs)
     reason = _interrupt_reason(interrupt_checker)
     if reason:
         return TmuxSendResult("interrupted", reason)
@@ -379,13 +1110,7 @@ def _tmux_send_once(
     send_enter = run_tmux(["send-keys", "-t", pane, "C-m"])
     if send_enter.returncode == 0:
         return TmuxSendResult("ok")
-
-    detail_parts = [f"send-enter rc={send_enter.returncode}"]
-    for stream_name, stream in (("stderr", send_enter.stderr), ("stdout", send_enter.stdout)):
-        text = (stream or "").strip()
-        if text:
-            detail_parts.append(f"send-enter {stream_name}={text}")
-    return TmuxSendResult("error", "; ".join(detail_parts))
+    return _tmux_send_failure("send-enter", send_enter)
 
 
 def tmux_send(
@@ -394,14 +1119,12 @@ def tmux_send(
     enter_delay_secs: float,
     interrupt_checker: Optional[Callable[[], Optional[str]]] = None,
 ) -> TmuxSendResult:
-    # If user is browsing scrollback, leave copy mode before injecting text.
-    tmux_cancel_mode_if_needed(pane)
+    # Each attempt leaves copy mode first if the user is browsing scrollback.
     result = _tmux_send_once(pane, msg, enter_delay_secs, interrupt_checker=interrupt_checker)
     if result.status != "error":
         return result
 
-    # One retry after a best-effort mode cancel handles transient mode races.
-    tmux_cancel_mode_if_needed(pane)
+    # One retry handles transient mode races.
     retry = _tmux_send_once(pane, msg, enter_delay_secs, interrupt_checker=interrupt_checker)
     if retry.status != "error":
         return retry
@@ -417,19 +1140,54 @@ def read_state(path: Path) -> dict:
         return {}
 
 
+# Last JSON text written per state file, so unchanged state is not rewritten.
+_LAST_STATE_TEXT: dict[Path, str] = {}
+
+
 def write_state(path: Path, state: dict) -> None:
+    text = json.dumps(state, separators=(",", ":"))
+    if _LAST_STATE_TEXT.get(path) == text:
+        return
+    # One watcher owns each session file, so a pid-named temp is unique
+    # without mkstemp's random-name retries; watchd's writers use mkstemp.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        import tempfile
-        fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
-        with os.fdopen(fd, "w") as f:
-            f.write(json.dumps(state, indent=2, sort_keys=True))
-        os.replace(tmp, str(path))
+        try:
+            fd = os.open(tmp, flags, 0o600)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(tmp, flags, 0o600)
+        try:
+            os.write(fd, text.encode("utf-8"))
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
     except OSError:
         try:
             os.unlink(tmp)
-        except (OSError, UnboundLocalError):
+        except OSError:
             pass
+        return
+    _LAST_STATE_TEXT[path] = text
+
+
+# (monotonic expiry, boot epoch, clock ticks per second), so per-pid lookups
+# only need /proc/<pid>/stat. The boot epoch is wall-clock based and moves
+# with an NTP step or a suspend/resume, so the long-lived watcher re-derives
+# it every BOOT_CLOCK_TTL_SECS.
+BOOT_CLOCK_TTL_SECS = 30.0
+_BOOT_CLOCK: Optional[tuple[float, float, int]] = None
+
+
+def _boot_clock() -> tuple[float, int]:
+    global _BOOT_CLOCK
+    now = time.monotonic()
+    if _BOOT_CLOCK is None or now >= _BOOT_CLOCK[0]:
+        uptime_secs = float(Path("/proc/uptime").read_text(encoding="utf-8").split()[0])
+        hz = _BOOT_CLOCK[2] if _BOOT_CLOCK is not None else os.sysconf("SC_CLK_TCK")
+        _BOOT_CLOCK = (now + BOOT_CLOCK_TTL_SECS, time.time() - uptime_secs, hz)
+    return _BOOT_CLOCK[1], _BOOT_CLOCK[2]
 
 
 def _process_start_epoch(pid: str) -> Optional[float]:
@@ -437,16 +1195,45 @@ def _process_start_epoch(pid: str) -> Optional[float]:
     if not pid.isdigit():
         return None
     try:
-        stat_fields = Path(f"/proc/{pid}/stat").read_text(encoding="utf-8").split()
-        start_ticks = int(stat_fields[21])
-        uptime_secs = float(Path("/proc/uptime").read_text(encoding="utf-8").split()[0])
+        stat = Path(f"/proc/{pid}/stat").read_text(encoding="utf-8")
+        # comm (field 2) may contain spaces; starttime is field 22, the 20th
+        # after the closing parenthesis.
+        start_ticks = int(stat.rpartition(")")[2].split()[19])
+        boot_time, hz = _boot_clock()
     except (OSError, ValueError, IndexError):
         return None
-    hz = os.sysconf(os.sysconf_names["SC_CLK_TCK"])
-    boot_time = time.time() - uptime_secs
     return boot_time + (start_ticks / hz)
 
 
+# state_dir -> ((st_ino, st_mtime_ns), state_*.sqlite paths). Adding, removing
+# or renaming a file bumps the directory mtime, so the listing of the busy
+# ~/.codex directory is only redone when it can have changed.
+_STATE_DB_LISTING: dict[Path, tuple[tuple[int, int], list[Path]]] = {}
+
+
+def state_db_paths(state_dir: Path = STATE_DIR) -> list[Path]:
+    """Return the Codex ``state_*.sqlite`` files in *state_dir*, newest first."""
+    try:
+        st = state_dir.stat()
+    except OSError:
+        return []
+    key = (st.st_ino, st.st_mtime_ns)
+    cached = _STATE_DB_LISTING.get(state_dir)
+    if cached is not None and cached[0] == key:
+        paths = cached[1]
+    else:
+        paths = list(state_dir.glob("state_*.sqlite"))
+        _STATE_DB_LISTING[state_dir] = (key, paths)
+    dated: list[tuple[float, Path]] = []
+    for path in paths:
+        try:
+            dated.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    dated.sort(key=lambda item: item[0], reverse=True)
+    return [path for _, path in dated]
+
+
 def thread_times_from_state_db(thread_id: str, state_dir: Path = STATE_DIR) -> tuple[Optional[int], Optional[int]]:
     """Return ``(started_at, last_activity_at)`` for a thread from local Codex state."""
     if not is_thread_id(thread_id) or not state_dir.is_dir():
@@ -454,7 +1241,7 @@ def thread_times_from_state_db(thread_id: str, state_dir: Path = STATE_DIR) -> t
 
     best: tuple[Optional[int], Optional[int]] = (None, None)
     best_last = -1
-    for db_path in sorted(state_dir.glob("state_*.sqlite"), key=lambda p: p.stat().st_mtime, reverse=True):
+    for db_path in state_db_paths(state_dir):
         try:
             conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         except sqlite3.Error:
@@ -506,7 +1293,7 @@ def _thread_from_state_db_cwd(
         return None
 
     started_at = int(process_started_at) if process_started_at is not None else None
-    for db_path in sorted(state_dir.glob("state_*.sqlite"), key=lambda p: p.stat().st_mtime, reverse=True):
+    for db_path in state_db_paths(state_dir):
         try:
             conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         except sqlite3.Error:
@@ -546,7 +1333,7 @@ def _thread_from_state_db_pid(pid: str, state_dir: Path = STATE_DIR) -> Optional
     started_at = _process_start_epoch(pid)
     min_ts = int(started_at) if started_at is not None else None
 
-    for db_path in sorted(state_dir.glob("state_*.sqlite"), key=lambda p: p.stat().st_mtime, reverse=True):
+    for db_path in state_db_paths(state_dir):
         try:
             conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         except sqlite3.Error:
@@ -576,6 +1363,41 @@ def _thread_from_state_db_pid(pid: str, state_dir: Path = STATE_DIR) -> Optional
     return None
 
 
+def process_children() -> dict[str, list[str]]:
+    """Map each pid to its child pids from one pass over ``/proc``."""
+    children: dict[str, list[str]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return {}
+    for pid in entries:
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat", encoding="utf-8") as fh:
+                stat = fh.read()
+        except OSError:
+            # The process exited between the listing and the read.
+            continue
+        # comm (field 2) may contain spaces; ppid is field 4, the 2nd after
+        # the closing parenthesis.
+        fields = stat.rpartition(")")[2].split()
+        if len(fields) > 1:
+            children.setdefault(fields[1], []).append(pid)
+    return children
+
+
+def process_tree(root: str, children: dict[str, list[str]]) -> list[str]:
+    """Return *root* and its descendants, depth first like ``pstree -p``."""
+    pids: list[str] = []
+    stack = [root]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(reversed(children.get(pid, ())))
+    return pids
+
+
 def thread_from_codex_pid(pid: str) -> Optional[str]:
     """If *pid* is a codex process, return its thread_id from local Codex state."""
     try:
@@ -589,26 +1411,19 @@ def thread_from_codex_pid(pid: str) -> Optional[str]:
 
 def discover_thread_for_pane(pane: str) -> Optional[str]:
     """Discover the thread_id for the codex process running in *pane*."""
-    rc = run_tmux(["list-panes", "-t", pane, "-F", "#{pane_pid}"])
-    if rc.returncode != 0 or not rc.stdout.strip():
+    pane_pid = tmux_pane_status(pane).get("pane_pid", "")
+    if not pane_pid:
         return None
-    try:
-        result = subprocess.run(
-            ["pstree", "-p", rc.stdout.strip()],
-            capture_output=True, text=True, check=False,
-        )
-        if result.returncode != 0:
-            return None
-    except FileNotFoundError:
+    children = process_children()
+    if not children:
         return None
-    codex_pids: list[str] = []
-    for pid in re.findall(r"\((\d+)\)", result.stdout):
-        codex_pids.append(pid)
+    tree_pids = process_tree(pane_pid, children)
+    for pid in tree_pids:
         tid = thread_from_codex_pid(pid)
         if tid:
             return tid
     pane_cwd = tmux_pane_cwd(pane)
-    for pid in codex_pids:
+    for pid in tree_pids:
         started_at = _process_start_epoch(pid)
         tid = _thread_from_state_db_cwd(pane_cwd, started_at)
         if tid:
@@ -651,6 +1466,7 @@ def main() -> int:
     if not tmux_pane_exists(args.pane):
         sys.stderr.write(f"auto_continue_logwatch: tmux pane not found: {args.pane}\n")
         return 2
+    start_tmux_control(args.pane)
 
     state_file = Path(args.state_file) if args.state_file else _session_state_path("unknown")
     watch_log = Path(args.watch_log) if args.watch_log else (cwd / ".codex" / "auto_continue_logwatch.log")
@@ -683,6 +1499,11 @@ def main() -> int:
 
     last_send_time = 0.0
     codex_fh = None
+    codex_pending = b""
+    codex_ino = 0
+    codex_read_from_start = False
+    last_rotation_check = 0.0
+    rotation_check_due = False
     health = "ok"
     health_detail = ""
     last_health_check = 0.0
@@ -712,7 +1533,7 @@ def main() -> int:
             watched_thread=watched_thread,
             watcher_start=watcher_start,
             now=now,
-            codex_log_exists=codex_log.exists(),
+            codex_log_exists=codex_fh is not None or codex_log.exists(),
         )
         if new_health == health and new_detail == health_detail:
             return
@@ -737,7 +1558,7 @@ def main() -> int:
     # of codex-tui.log and only replay a completion when it is the latest known
     # activity for this thread.
     pending_initial_event: Optional[tuple[str, str, str]] = None
-    if watched_thread and codex_log.exists():
+    if watched_thread:
         pending_initial_event = check_codex_log_tail_for_pending(
             codex_log, watched_thread, last_handled_turn, last_handled_thread,
             watch_log,
@@ -745,6 +1566,7 @@ def main() -> int:
 
     # --- Set up inotify file watching (falls back to polling if unavailable) ---
     _wake_event = threading.Event()
+    _replaced_event = threading.Event()
     _watched_paths: set[str] = set()
     _watched_dirs: set[str] = set()
     _observer = None
@@ -752,8 +1574,6 @@ def main() -> int:
     def _add_inotify_watch(file_path: Path) -> None:
         """Register a file for inotify monitoring."""
         nonlocal _observer
-        if _WatchdogObserver is None:
-            return
         path_str = str(file_path.resolve())
         if path_str in _watched_paths:
             return
@@ -764,10 +1584,9 @@ def main() -> int:
         if not os.path.isdir(dir_str):
             return
         if _observer is None:
-            _observer = _WatchdogObserver()
-            _observer.daemon = True
-            _observer._acw_handler = _WakeHandler(_wake_event, _watched_paths)
-            _observer.start()
+            _observer = _start_file_observer(_wake_event, _watched_paths, _replaced_event)
+            if _observer is None:
+                return
         try:
             _observer.schedule(_observer._acw_handler, dir_str, recursive=False)
         except OSError:
@@ -776,11 +1595,18 @@ def main() -> int:
 
     codex_log.parent.mkdir(parents=True, exist_ok=True)
     _add_inotify_watch(codex_log)
+    codex_dir_str = str(codex_log.resolve().parent)
 
+    # Local aliases for the per-line parsers used in the tail loop below.
+    parse_interrupt = parse_codex_log_interrupt
+    parse_event = parse_codex_log_event
+
+    poll_secs = POLL_MIN_SECS
     while True:
         _wake_event.clear()
 
         events: list[CodexLogEvent] = []
+        read_any = False
         tnow = time.time()
 
         # Inject the pending startup event on the first iteration only.
@@ -789,15 +1615,33 @@ def main() -> int:
             pending_initial_event = None
 
         # --- Poll codex-tui.log ---
-        if codex_fh is not None or codex_log.exists():
-            if codex_fh is None:
-                codex_fh = codex_log.open("r", encoding="utf-8", errors="ignore")
-                codex_fh.seek(0, os.SEEK_END)
-            while True:
-                line = codex_fh.readline()
-                if not line:
-                    break
-                interrupt_thread = parse_codex_log_interrupt(line)
+        if codex_fh is None:
+            try:
+                codex_fh = codex_log.open("rb", buffering=0)
+            except FileNotFoundError:
+                pass
+            else:
+                codex_pending = b""
+                codex_ino = os.fstat(codex_fh.fileno()).st_ino
+                if not codex_read_from_start:
+                    codex_fh.seek(0, os.SEEK_END)
+                codex_read_from_start = False
+                last_rotation_check = time.monotonic()
+        if codex_fh is not None:
+            lines, codex_pending, read_any = read_complete_lines(
+                codex_fh, codex_pending, SESSION_LOOP_MARKER_BYTES
+            )
+            for raw in lines:
+                # Most session_loop lines are neither completions nor
+                # interrupts; only decode the ones that can be.
+                if (
+                    EVENT_MARKER_BYTES not in raw
+                    and TASK_CLOSE_MARKER_BYTES not in raw
+                    and INTERRUPT_MARKER_BYTES not in raw
+                ):
+                    continue
+                line = raw.decode("utf-8", "ignore")
+                interrupt_thread = parse_interrupt(line)
                 if interrupt_thread:
                     events.append(
                         CodexLogEvent(
@@ -807,19 +1651,52 @@ def main() -> int:
                         )
                     )
                     continue
-                event = parse_codex_log_event(line)
+                event = parse_event(line)
                 if event:
                     events.append(CodexLogEvent("completion", *event))
-            # Detect truncation/rotation.
-            try:
-                if codex_fh.tell() > codex_log.stat().st_size:
+            # Detect truncation/rotation once the handle has gone idle. While
+            # the observer watches the log's directory it reports every
+            # rename, delete or create of the path, so without such a report
+            # only an in-place truncation is possible and fstat on the open
+            # handle finds it without a path lookup. Otherwise stat the path
+            # at most every ROTATION_CHECK_SECS (at once after a reported
+            # replacement): a replaced file shows up as an inode change even
+            # when it is already larger than our offset, and is then read
+            # from the start. A check deferred by the rate limit shortens the
+            # next wait so it cannot be lost, and a replacement reported
+            # while the old handle was still draining forces another pass so
+            # the new file is reopened without waiting for further writes.
+            mono = time.monotonic()
+            rotation_check_due = False
+            if not read_any:
+                replaced = _replaced_event.is_set()
+                if replaced:
+                    _replaced_event.clear()
+                    last_rotation_check = 0.0
+                if not replaced and codex_dir_str in _watched_dirs:
+                    stale = os.fstat(codex_fh.fileno()).st_size < codex_fh.tell()
+                else:
+                    rotation, last_rotation_check = check_log_rotation(
+                        codex_log, codex_fh, codex_ino, last_rotation_check, mono
+                    )
+                    rotation_check_due = rotation == "deferred"
+                    stale = rotation == "replaced"
+                    if rotation == "gone":
+                        codex_fh.close()
+                        codex_fh = None
+                        codex_read_from_start = True
+                if stale:
                     codex_fh.close()
                     codex_fh = None
-            except FileNotFoundError:
-                codex_fh.close()
-                codex_fh = None
+                    codex_read_from_start = True
+                    # Reopen and read the new file without waiting.
+                    _wake_event.set()
+            elif _replaced_event.is_set():
+                _wake_event.set()
 
         # --- Process collected events ---
+        if len(events) > 1:
+            events = coalesce_completions(events)
         for event in events:
             tnow = time.time()
             thread_id = event.thread_id
@@ -849,12 +1726,11 @@ def main() -> int:
                 skip_interrupted_turn(turn_id, thread_id, "Conversation interrupted")
                 continue
 
-            pane_interrupt = check_pane_for_interrupt(args.pane)
+            pane_interrupt, pane_error = check_pane(args.pane)
             if pane_interrupt:
                 skip_interrupted_turn(turn_id, thread_id, pane_interrupt)
                 continue
 
-            pane_error = check_pane_for_errors(args.pane)
             if pane_error:
                 auto_pause_current_watcher(pane_error, watch_log, state_file, state)
                 continue
@@ -866,12 +1742,11 @@ def main() -> int:
             if args.send_delay_secs > 0.0:
                 time.sleep(args.send_delay_secs)
 
-            pane_interrupt = check_pane_for_interrupt(args.pane)
+            pane_interrupt, pane_error = check_pane(args.pane)
             if pane_interrupt:
                 skip_interrupted_turn(turn_id, thread_id, pane_interrupt)
                 continue
 
-            pane_error = check_pane_for_errors(args.pane)
             if pane_error:
                 auto_pause_current_watcher(pane_error, watch_log, state_file, state)
                 continue
@@ -912,6 +1787,7 @@ def main() -> int:
         # --- Periodic health check ---
         if tnow - last_health_check > HEALTH_CHECK_INTERVAL:
             last_health_check = tnow
+            _reopen_unlinked_log_handles()
 
             # Re-discover thread from pane's codex process in case the
             # session was restarted with a new thread.
@@ -945,9 +1821,17 @@ def main() -> int:
         # periodic health checks.
         if not _wake_event.is_set():
             if _observer is None:
-                timeout = 1.0
+                # Without file notifications, poll quickly while codex is
+                # writing and back off towards once a second when it idles.
+                if read_any:
+                    poll_secs = POLL_MIN_SECS
+                else:
+                    poll_secs = min(POLL_MAX_SECS, poll_secs * 2)
+                timeout = poll_secs
             else:
                 timeout = HEALTH_CHECK_INTERVAL
+            if rotation_check_due:
+                timeout = min(timeout, ROTATION_CHECK_SECS)
             _wake_event.wait(timeout=timeout)
 
 
@@ -3,7 +3,6 @@
 
 from __future__ import annotations
 
-import glob
 import json
 import os
 import re
@@ -17,8 +16,12 @@ import tempfile
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import NamedTuple
 
 from auto_continue_logwatch import discover_thread_for_pane as _discover_thread_for_pane
+from auto_continue_logwatch import process_children
+from auto_continue_logwatch import process_tree
+from auto_continue_logwatch import state_db_paths
 from auto_continue_logwatch import thread_times_from_state_db
 from auto_continue_logwatch import thread_from_codex_pid as _thread_from_codex_pid
 
@@ -29,6 +32,10 @@ from auto_continue_logwatch import thread_from_codex_pid as _thread_from_codex_p
 THREAD_ID_RE = re.compile(
     r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
 )
+# "N" or "session:N" window targets; group 1 is the session, if given.
+_WINDOW_TARGET_RE = re.compile(r"(?:([^:]+):)?(\d+)")
+_WINDOW_LABEL_RE = re.compile(r"([^:]+):(\d+):")
+_RICH_MARKUP_RE = re.compile(r"\[/?[^\]]*\]")
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_ROOT = SCRIPT_DIR.parent
@@ -42,17 +49,28 @@ def resolve_project_cwd() -> str:
             return str(Path(env).resolve())
         return env
 
-    pwd_real = str(Path.cwd().resolve())
-    try:
-        git_root = subprocess.check_output(
-            ["git", "-C", pwd_real, "rev-parse", "--show-toplevel"],
-            stderr=subprocess.DEVNULL,
-            text=True,
-        ).strip()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        git_root = ""
-    if git_root:
-        return git_root
+    pwd = Path.cwd().resolve()
+    pwd_real = str(pwd)
+    if os.environ.get("GIT_DIR") or os.environ.get("GIT_WORK_TREE"):
+        # The repository is set explicitly and need not contain a .git entry
+        # at all; only git itself resolves that.
+        try:
+            git_root = subprocess.check_output(
+                ["git", "-C", pwd_real, "rev-parse", "--show-toplevel"],
+                stderr=subprocess.DEVNULL,
+                text=True,
+            ).strip()
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            git_root = ""
+        if git_root:
+            return git_root
+    else:
+        # Runs on every acw invocation: find the work tree by looking for a
+        # .git entry (a directory, or a file for worktrees/submodules)
+        # instead of forking git.
+        for parent in (pwd, *pwd.parents):
+            if (parent / ".git").exists():
+                return str(parent)
 
     if os.path.basename(pwd_real) == ".codex":
         return os.path.dirname(pwd_real)
@@ -134,16 +152,30 @@ Default message file:
 # ---------------------------------------------------------------------------
 
 
+_KEY_SAFE_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-")
+_KEY_TRANSLATE = {c: "_" for c in range(128) if chr(c) not in _KEY_SAFE_CHARS}
+_KEY_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9._-]")
+_PANE_ID_RE = re.compile(r"%[0-9]+")
+# Pane ids are a small, stable set per tmux server; status and cleanup map
+# the same few panes to keys for every watcher row.
+_PANE_KEY_CACHE: dict[str, str] = {}
+
+
 def sanitize_key(s: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9._-]", "_", s)
+    if s.isascii():
+        return s.translate(_KEY_TRANSLATE)
+    return _KEY_UNSAFE_RE.sub("_", s)
 
 
 def key_from_pane(pane: str) -> str:
-    return sanitize_key(pane)
+    key = _PANE_KEY_CACHE.get(pane)
+    if key is None:
+        key = _PANE_KEY_CACHE[pane] = sanitize_key(pane)
+    return key
 
 
 def is_pane_id(s: str) -> bool:
-    return bool(re.fullmatch(r"%[0-9]+", s))
+    return bool(_PANE_ID_RE.fullmatch(s))
 
 
 def current_tmux_pane() -> str:
@@ -156,6 +188,24 @@ def _truncate(s: str, width: int) -> str:
     return s if len(s) <= width else s[: width - 3] + "..."
 
 
+def _tail_lines(path: str, count: int, max_bytes: int = 64 * 1024) -> list[str]:
+    """Return up to the last *count* lines of *path*, newlines kept.
+
+    Only the final *max_bytes* are read, so a long-lived log costs the same
+    as a fresh one. Raises OSError like open().
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - max_bytes)
+        f.seek(start)
+        data = f.read()
+    lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+    if start > 0 and lines:
+        # The first line of the window is usually cut off; drop it.
+        lines = lines[1:]
+    return lines[-count:]
+
+
 def _read_pid_file(path: str) -> str | None:
     """Read a PID file and return the pid string, or None if missing/invalid."""
     try:
@@ -170,6 +220,25 @@ def is_thread_id(s: str) -> bool:
     return bool(THREAD_ID_RE.fullmatch(s))
 
 
+def _state_dir_names() -> list[str]:
+    """Return the entry names in STATE_DIR from a single directory read."""
+    try:
+        with os.scandir(STATE_DIR) as it:
+            return [e.name for e in it]
+    except OSError:
+        return []
+
+
+def _state_files(prefix: str, suffix: str) -> list[str]:
+    """Return STATE_DIR paths named ``<prefix>*<suffix>`` (one scandir, no fnmatch)."""
+    min_len = len(prefix) + len(suffix)
+    return [
+        os.path.join(STATE_DIR, name)
+        for name in _state_dir_names()
+        if len(name) > min_len and name.startswith(prefix) and name.endswith(suffix)
+    ]
+
+
 def pid_file_for_key(key: str) -> str:
     return os.path.join(STATE_DIR, f"auto_continue_logwatch.{key}.pid")
 
@@ -186,29 +255,62 @@ def state_file_for_thread(thread_id: str) -> str:
     return os.path.join(STATE_DIR, f"acw_session.{thread_id}.json")
 
 
-def _read_session_state(thread_id: str) -> dict:
-    path = state_file_for_thread(thread_id)
+# Parsed session files keyed by path. status reads each file several times
+# (session list, health, message, recommendations); the (inode, mtime, ctime,
+# size) stamp lets every read after the first cost one stat instead of a
+# parse. Session files are replaced by rename, so a freed inode can come back
+# with the same size inside one coarse timestamp tick; a file modified within
+# JSON_CACHE_RACY_SECS is therefore parsed every time and never cached.
+JSON_CACHE_RACY_SECS = 1.0
+_JSON_FILE_CACHE: dict[str, tuple[tuple[int, int, int, int], dict]] = {}
+
+
+def _read_json_file(path: str) -> dict:
+    """Return a copy of the JSON object stored in *path*, or {} if unreadable."""
     try:
-        with open(path) as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError):
+        st = os.stat(path)
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+        cached = _JSON_FILE_CACHE.get(path)
+        if cached is not None and cached[0] == stamp:
+            return dict(cached[1])
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
         return {}
+    if time.time() - st.st_mtime >= JSON_CACHE_RACY_SECS:
+        _JSON_FILE_CACHE[path] = (stamp, data)
+    else:
+        _JSON_FILE_CACHE.pop(path, None)
+    return dict(data)
+
+
+def _read_session_state(thread_id: str) -> dict:
+    return _read_json_file(state_file_for_thread(thread_id))
 
 
 def _write_session_state(thread_id: str, data: dict) -> None:
     path = state_file_for_thread(thread_id)
     existing = _read_session_state(thread_id)
-    existing.update(data)
+    merged = {**existing, **data}
+    if existing and merged == existing:
+        return
+    # Compact, unsorted JSON to match the watcher's own write_state(); the
+    # file is an advisory cache, so there is no fsync before the rename.
+    text = json.dumps(merged, separators=(",", ":"))
+    tmp = ""
     try:
         fd, tmp = tempfile.mkstemp(dir=STATE_DIR, suffix=".tmp")
         with os.fdopen(fd, "w") as f:
-            json.dump(existing, f, indent=2, sort_keys=True)
+            f.write(text)
         os.replace(tmp, path)
     except OSError:
-        try:
-            os.unlink(tmp)
-        except OSError:
-            pass
+        if tmp:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
 
 
 # ---------------------------------------------------------------------------
@@ -273,19 +375,31 @@ def _preferred_tmux_socket() -> str:
     return sock if sock else _tmux_socket_from_env()
 
 
+# $TMUX -> health probe result. One acw invocation can hit several failing
+# tmux commands (missing panes, unset options); the current server does not
+# come and go between them, so it is probed once per $TMUX value.
+_TMUX_CLIENT_HEALTH: dict[str, bool] = {}
+
+
 def _tmux_client_env_healthy() -> bool:
     """Return True when TMUX points to a live current client/server."""
-    if not os.environ.get("TMUX", ""):
+    tmux_env = os.environ.get("TMUX", "")
+    if not tmux_env:
         return False
+    healthy = _TMUX_CLIENT_HEALTH.get(tmux_env)
+    if healthy is not None:
+        return healthy
     try:
         subprocess.check_output(
             ["tmux", "display-message", "-p", "#{session_name}"],
             stderr=subprocess.DEVNULL,
             text=True,
         )
-        return True
+        healthy = True
     except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        healthy = False
+    _TMUX_CLIENT_HEALTH[tmux_env] = healthy
+    return healthy
 
 
 def _tmux_server_pids() -> list[str]:
@@ -352,50 +466,71 @@ def _print_tmux_unavailable_hint(target: str) -> None:
         print(recovery, file=sys.stderr)
 
 
+class _PaneRow(NamedTuple):
+    session: str
+    window_index: str
+    pane_id: str
+    pane_active: str
+    window_active: str
+    pane_index: str
+    pane_pid: str
+    window_name: str
+
+
+# window_name goes last so a tab inside it cannot shift the other columns.
+_PANE_ROW_FORMAT = (
+    "#{session_name}\t#{window_index}\t#{pane_id}\t#{pane_active}\t"
+    "#{window_active}\t#{pane_index}\t#{pane_pid}\t#{window_name}"
+)
+# Target resolution, status labels and restart liveness all need the same
+# server-wide pane list; acw never creates or moves panes, so one
+# ``list-panes -a`` serves the whole invocation.
+_PANE_ROWS: list[_PaneRow] | None = None
+
+
+def _list_panes() -> list[_PaneRow] | None:
+    """Return every pane on the tmux server, or None if tmux is unreachable."""
+    global _PANE_ROWS
+    if _PANE_ROWS is None:
+        listing = run_tmux("list-panes", "-a", "-F", _PANE_ROW_FORMAT)
+        if listing is None:
+            return None
+        rows: list[_PaneRow] = []
+        for line in listing.splitlines():
+            parts = line.split("\t", 7)
+            if len(parts) == 8:
+                rows.append(_PaneRow(*parts))
+        _PANE_ROWS = rows
+    return _PANE_ROWS
+
+
+def _forget_pane_rows() -> None:
+    global _PANE_ROWS
+    _PANE_ROWS = None
+
+
 def resolve_pane_from_window_target(target: str) -> str | None:
     """Resolve a window index or session:window to a pane id."""
-    m = re.fullmatch(r"(\d+)", target)
-    if m:
-        requested_session = ""
-        requested_window = m.group(1)
-    else:
-        m = re.fullmatch(r"([^:]+):(\d+)", target)
-        if m:
-            requested_session = m.group(1)
-            requested_window = m.group(2)
-        else:
-            return None
+    m = _WINDOW_TARGET_RE.fullmatch(target)
+    if not m:
+        return None
+    requested_session = m.group(1) or ""
+    requested_window = m.group(2)
 
-    fmt = "#{session_name}\t#{window_index}\t#{pane_id}\t#{pane_active}\t#{window_active}\t#{pane_index}"
-    listing = run_tmux("list-panes", "-a", "-F", fmt)
-    if listing is None:
+    panes = _list_panes()
+    if panes is None:
         _print_tmux_unavailable_hint(target)
         return None
 
-    rows: list[dict[str, str]] = []
+    rows: list[_PaneRow] = []
     session_seen: set[str] = set()
-    for line in listing.splitlines():
-        if not line:
+    for row in panes:
+        if not row.pane_id or row.window_index != requested_window:
             continue
-        parts = line.split("\t")
-        if len(parts) < 6:
+        if requested_session and row.session != requested_session:
             continue
-        sess, widx, pid_, pactive, wactive, pidx = parts[:6]
-        if not pid_ or widx != requested_window:
-            continue
-        if requested_session and sess != requested_session:
-            continue
-        rows.append(
-            dict(
-                session=sess,
-                window_index=widx,
-                pane_id=pid_,
-                pane_active=pactive,
-                window_active=wactive,
-                pane_index=pidx,
-            )
-        )
-        session_seen.add(sess)
+        rows.append(row)
+        session_seen.add(row.session)
 
     if not rows:
         return None
@@ -404,11 +539,11 @@ def resolve_pane_from_window_target(target: str) -> str | None:
         active_session = ""
         active_conflict = False
         for r in rows:
-            if r["window_active"] != "1":
+            if r.window_active != "1":
                 continue
             if not active_session:
-                active_session = r["session"]
-            elif active_session != r["session"]:
+                active_session = r.session
+            elif active_session != r.session:
                 active_conflict = True
                 break
 
@@ -429,12 +564,12 @@ def resolve_pane_from_window_target(target: str) -> str | None:
     selected = ""
     fallback = ""
     for r in rows:
-        if requested_session and r["session"] != requested_session:
+        if requested_session and r.session != requested_session:
             continue
         if not fallback:
-            fallback = r["pane_id"]
-        if r["pane_active"] == "1":
-            selected = r["pane_id"]
+            fallback = r.pane_id
+        if r.pane_active == "1":
+            selected = r.pane_id
             break
 
     if not selected:
@@ -445,27 +580,18 @@ def resolve_pane_from_window_target(target: str) -> str | None:
 
 def resolve_pane_from_window_name(name: str) -> str | None:
     """Resolve a window name to a pane id.  Returns None if not found or ambiguous."""
-    fmt = "#{session_name}\t#{window_index}\t#{window_name}\t#{pane_id}\t#{pane_active}"
-    listing = run_tmux("list-panes", "-a", "-F", fmt)
-    if not listing:
+    panes = _list_panes()
+    if not panes:
         return None
 
-    matches: list[tuple[str, str, str, str]] = []  # (session, window_index, pane_id, pane_active)
-    for line in listing.splitlines():
-        parts = line.split("\t")
-        if len(parts) < 5:
-            continue
-        sess, widx, wname, pid_, pactive = parts[:5]
-        if wname == name:
-            matches.append((sess, widx, pid_, pactive))
-
+    matches = [r for r in panes if r.window_name == name]
     if not matches:
         return None
     if len(matches) == 1:
-        return matches[0][2] if is_pane_id(matches[0][2]) else None
+        return matches[0].pane_id if is_pane_id(matches[0].pane_id) else None
 
     # Multiple panes across windows with the same name — ambiguous.
-    unique_windows = {(s, w) for s, w, _, _ in matches}
+    unique_windows = {(r.session, r.window_index) for r in matches}
     if len(unique_windows) > 1:
         labels = ", ".join(f"{s}:{w}" for s, w in sorted(unique_windows))
         print(
@@ -475,10 +601,10 @@ def resolve_pane_from_window_name(name: str) -> str | None:
         return None
 
     # Multiple panes in the same window — pick the active one, else first.
-    for s, w, p, pa in matches:
-        if pa == "1" and is_pane_id(p):
-            return p
-    return matches[0][2] if is_pane_id(matches[0][2]) else None
+    for r in matches:
+        if r.pane_active == "1" and is_pane_id(r.pane_id):
+            return r.pane_id
+    return matches[0].pane_id if is_pane_id(matches[0].pane_id) else None
 
 
 def resolve_pane_target(target: str) -> str:
@@ -489,7 +615,7 @@ def resolve_pane_target(target: str) -> str:
     if is_pane_id(target):
         return target
 
-    if re.fullmatch(r"\d+", target) or re.fullmatch(r"[^:]+:\d+", target):
+    if _WINDOW_TARGET_RE.fullmatch(target):
         pane = resolve_pane_from_window_target(target)
         if pane and is_pane_id(pane):
             return pane
@@ -523,7 +649,7 @@ def resolve_start_pane_target(target: str) -> str:
     if is_pane_id(target):
         return target
 
-    if re.fullmatch(r"\d+", target) or re.fullmatch(r"[^:]+:\d+", target):
+    if _WINDOW_TARGET_RE.fullmatch(target):
         pane = resolve_pane_from_window_target(target)
         if pane and is_pane_id(pane):
             return pane
@@ -662,8 +788,15 @@ def _set_thread_name(thread_id: str, name: str) -> None:
     _write_session_state(thread_id, {"thread_id": thread_id, "name": name})
 
 
+# The hook is server-global, so restart-all only needs to set it once.
+_RENAME_HOOK_INSTALLED = False
+
+
 def ensure_tmux_window_rename_hook() -> None:
     """Install a global tmux hook to keep session names in sync."""
+    global _RENAME_HOOK_INSTALLED
+    if _RENAME_HOOK_INSTALLED:
+        return
     cmd = (
         f"{shlex.quote(sys.executable)} "
         f"{shlex.quote(str(Path(__file__).resolve()))} "
@@ -671,7 +804,8 @@ def ensure_tmux_window_rename_hook() -> None:
         "\"#{window_id}\" "
         "#{q:window_name}"
     )
-    run_tmux("set-hook", "-g", "window-renamed", f"run-shell {shlex.quote(cmd)}")
+    if run_tmux("set-hook", "-g", "window-renamed", f"run-shell {shlex.quote(cmd)}") is not None:
+        _RENAME_HOOK_INSTALLED = True
 
 
 def cmd_window_renamed(argv: list[str]) -> None:
@@ -754,13 +888,71 @@ def _pane_exists_on_socket(pane: str, socket_path: str) -> bool:
     return out == pane
 
 
+def _is_python_token(token: str) -> bool:
+    """True for an argv word naming a python interpreter (``python``, ``/usr/bin/python3.11``)."""
+    name = token.rpartition("/")[2]
+    return name.startswith("python") and not name[6:].strip("0123456789.")
+
+
+# One ps scan per acw invocation: cleanup and the command itself both list
+# watchers.  Anything that signals or spawns a watcher drops the snapshot.
+_WATCHER_PS_OUT: str | None = None
+
+
+def _watcher_ps_out() -> str | None:
+    global _WATCHER_PS_OUT
+    if _WATCHER_PS_OUT is None:
+        # Watchers always run as the invoking user, so only list that user's
+        # processes rather than every process on the host.
+        try:
+            _WATCHER_PS_OUT = subprocess.check_output(
+                ["ps", "-ww", "-u", str(os.getuid()), "-o", "pid=,state=,args="],
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return None
+    return _WATCHER_PS_OUT
+
+
+def _forget_watcher_scan() -> None:
+    global _WATCHER_PS_OUT
+    _WATCHER_PS_OUT = None
+
+
+def _signal_pid(pid: int, *sigs: int) -> None:
+    """Send *sigs* to *pid* in order; raises OSError like ``os.kill``.
+
+    The signals go through one pidfd, so a sequence such as SIGCONT then
+    SIGTERM reaches a single process even if *pid* is recycled in between.
+    Kernels without pidfd support fall back to ``os.kill``.  Any signal
+    invalidates the cached watcher scan.
+    """
+    _forget_watcher_scan()
+    try:
+        pidfd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        raise
+    except OSError:
+        for sig in sigs:
+            os.kill(pid, sig)
+        return
+    try:
+        for sig in sigs:
+            signal.pidfd_send_signal(pidfd, sig)
+    finally:
+        os.close(pidfd)
+
+
+def _terminate_pid(pid: int) -> None:
+    """SIGTERM *pid*, continuing it first so a paused watcher can exit."""
+    _signal_pid(pid, signal.SIGCONT, signal.SIGTERM)
+
+
 def watcher_rows(pane_filter: str = "") -> list[dict[str, str]]:
     """Find running logwatch.py instances via ps."""
-    try:
-        ps_out = subprocess.check_output(
-            ["ps", "-ww", "-eo", "pid=,args="], stderr=subprocess.DEVNULL, text=True
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    ps_out = _watcher_ps_out()
+    if ps_out is None:
         return []
 
     results: list[dict[str, str]] = []
@@ -770,11 +962,13 @@ def watcher_rows(pane_filter: str = "") -> list[dict[str, str]]:
         line = line.strip()
         if not line:
             continue
-        parts = line.split(None, 1)
-        if len(parts) < 2:
+        parts = line.split(None, 2)
+        if len(parts) < 3:
             continue
-        pid_str, argstr = parts
-        if not pid_str.isdigit():
+        pid_str, proc_state, argstr = parts
+        # Almost every process on the host is not a watcher; skip them before
+        # paying for shlex tokenization.
+        if not pid_str.isdigit() or "auto_continue_logwatch.py" not in argstr:
             continue
         # ps output loses null-delimited argv boundaries; use shell-like
         # splitting and rely on state files for canonical message data.
@@ -782,13 +976,14 @@ def watcher_rows(pane_filter: str = "") -> list[dict[str, str]]:
             tokens = shlex.split(argstr)
         except ValueError:
             tokens = argstr.split()
-        has_python = any(re.search(r"(^|/)python([0-9.]+)?$", t) for t in tokens)
+        has_python = any(_is_python_token(t) for t in tokens)
         has_script = any(t.endswith("auto_continue_logwatch.py") for t in tokens)
         if not has_python or not has_script:
             continue
 
         info = _parse_logwatch_args(tokens)
         info["pid"] = pid_str
+        info["proc_state"] = proc_state
 
         if not info["pane"]:
             continue
@@ -810,29 +1005,28 @@ def watcher_pids_for_pane(pane: str) -> list[str]:
     return [r["pid"] for r in watcher_rows(pane)]
 
 
-def _is_pid_stopped(pid: int) -> bool:
-    """Check if a process is in stopped (T) state via ``ps``."""
-    try:
-        state = subprocess.check_output(
-            ["ps", "-p", str(pid), "-o", "state="],
-            stderr=subprocess.DEVNULL,
-            text=True,
-        ).strip()
-        return state.startswith("T")
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
-    return False
+def _row_is_stopped(r: dict[str, str]) -> bool:
+    """Check if the watcher in a watcher_rows() row is stopped (T state).
 
+    Uses the state captured by the same ``ps`` scan, so no per-pid call.
+    """
+    return r.get("proc_state", "").startswith("T")
 
-def is_running_pid_file(pid_file: str) -> bool:
+
+def running_pid_from_file(pid_file: str) -> str | None:
+    """Return the pid recorded in *pid_file* if that process is alive, else None."""
     pid_str = _read_pid_file(pid_file)
     if not pid_str:
-        return False
+        return None
     try:
         os.kill(int(pid_str), 0)
-        return True
     except OSError:
-        return False
+        return None
+    return pid_str
+
+
+def is_running_pid_file(pid_file: str) -> bool:
+    return running_pid_from_file(pid_file) is not None
 
 
 def thread_from_running_watcher_for_pane(pane: str) -> str | None:
@@ -861,7 +1055,13 @@ def _edit_message_interactive(initial: str = "") -> str | None:
     try:
         with os.fdopen(fd, "w") as f:
             f.write(initial)
-        rc = subprocess.call([editor, tmp])
+        try:
+            rc = subprocess.call([editor, tmp])
+        finally:
+            # An editor session can last minutes; watchers and panes may have
+            # come and gone meanwhile, so later checks must rescan.
+            _forget_watcher_scan()
+            _forget_pane_rows()
         if rc != 0:
             print("editor exited with error, message unchanged", file=sys.stderr)
             return None
@@ -939,8 +1139,9 @@ def cmd_start(argv: list[str]) -> None:
     pf = pid_file_for_key(key)
     rl = run_log_for_key(key)
 
-    if is_running_pid_file(pf):
-        print(f"already running: pane={pane} pid={_read_pid_file(pf)}")
+    running_pid = running_pid_from_file(pf)
+    if running_pid:
+        print(f"already running: pane={pane} pid={running_pid}")
         return
 
     existing_pids = watcher_pids_for_pane(pane)
@@ -981,7 +1182,7 @@ def cmd_start(argv: list[str]) -> None:
                 break
 
     message_text = _message_text(msg_mode, msg_value)
-    wn = run_tmux("display-message", "-p", "-t", pane, "#{window_name}") or ""
+    wn = next((r.window_name for r in _list_panes() or [] if r.pane_id == pane), "")
     _write_session_state(thread_id, {
         "thread_id": thread_id,
         "name": wn.strip(),
@@ -998,16 +1199,26 @@ def cmd_start(argv: list[str]) -> None:
     run_tmux("set-option", "-w", "-t", pane, "automatic-rename", "off")
 
     cmd = _logwatch_cmd(pane, thread_id, _message_args(msg_mode, msg_value), key)
-    log_fh = open(rl, "a")
-    proc = subprocess.Popen(
-        cmd,
-        stdout=log_fh,
-        stderr=log_fh,
-        start_new_session=True,
-    )
-    log_fh.close()
+    # Hand the child a raw append-mode fd: no parent-side buffered file
+    # object, and the descriptor is closed even if Popen raises. 0o666 leaves
+    # the file mode to the umask, as the previous open(rl, "a") did.
+    log_fd = os.open(rl, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_CLOEXEC, 0o666)
+    _forget_watcher_scan()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=log_fd,
+            stderr=log_fd,
+            start_new_session=True,
+        )
+    finally:
+        os.close(log_fd)
 
-    time.sleep(0.2)
+    # Returns as soon as a watcher that fails at startup exits.
+    try:
+        proc.wait(timeout=0.2)
+    except subprocess.TimeoutExpired:
+        pass
     if proc.poll() is None:
         with open(pf, "w") as f:
             f.write(str(proc.pid))
@@ -1020,9 +1231,7 @@ def cmd_start(argv: list[str]) -> None:
         file=sys.stderr,
     )
     try:
-        with open(rl) as f:
-            lines = f.readlines()
-        for line in lines[-40:]:
+        for line in _tail_lines(rl, 40):
             print(line, end="")
     except OSError:
         pass
@@ -1033,11 +1242,8 @@ def stop_pid_file(pid_file: str) -> None:
     pid_str = _read_pid_file(pid_file)
     if pid_str is None:
         return
-    pid = int(pid_str)
     try:
-        if _is_pid_stopped(pid):
-            os.kill(pid, signal.SIGCONT)
-        os.kill(pid, signal.SIGTERM)
+        _terminate_pid(int(pid_str))
     except OSError:
         pass
     Path(pid_file).unlink(missing_ok=True)
@@ -1047,19 +1253,16 @@ def stop_pid_file(pid_file: str) -> None:
 def stop_pane_watchers(pane: str) -> None:
     key = key_from_pane(pane)
     pf = pid_file_for_key(key)
-    pane_pids = watcher_pids_for_pane(pane)
-    if not pane_pids:
+    rows = watcher_rows(pane)
+    if not rows:
         Path(pf).unlink(missing_ok=True)
         print(f"not running: pane={pane}")
         return
 
-    for pid_str in pane_pids:
-        pid = int(pid_str)
+    for r in rows:
+        pid_str = r["pid"]
         try:
-            # Resume first so a SIGSTOP'd process can handle SIGTERM.
-            if _is_pid_stopped(pid):
-                os.kill(pid, signal.SIGCONT)
-            os.kill(pid, signal.SIGTERM)
+            _terminate_pid(int(pid_str))
         except OSError:
             pass
         print(f"stopped: pane={pane} pid={pid_str}")
@@ -1085,11 +1288,8 @@ def _stop_watcher_rows(rows: list[dict[str, str]]) -> None:
         pid_str = r["pid"]
         if not pid_str.isdigit():
             continue
-        pid = int(pid_str)
         try:
-            if _is_pid_stopped(pid):
-                os.kill(pid, signal.SIGCONT)
-            os.kill(pid, signal.SIGTERM)
+            _terminate_pid(int(pid_str))
         except OSError:
             pass
         key = key_from_pane(r["pane"])
@@ -1117,7 +1317,7 @@ def cmd_stop(argv: list[str]) -> None:
         # Tmux window name or index.
         pane = resolve_pane_from_window_name(target)
         if not pane:
-            pane = resolve_pane_from_window_target(target) if re.fullmatch(r"\d+|[^:]+:\d+", target) else None
+            pane = resolve_pane_from_window_target(target) if _WINDOW_TARGET_RE.fullmatch(target) else None
         if pane and is_pane_id(pane):
             stop_pane_watchers(pane)
             return
@@ -1130,7 +1330,7 @@ def cmd_stop(argv: list[str]) -> None:
         sys.exit(1)
 
     had_any = False
-    for pf in glob.glob(os.path.join(STATE_DIR, "auto_continue_logwatch.*.pid")):
+    for pf in _state_files("auto_continue_logwatch.", ".pid"):
         had_any = True
         stop_pid_file(pf)
 
@@ -1140,7 +1340,7 @@ def cmd_stop(argv: list[str]) -> None:
             continue
         had_any = True
         try:
-            os.kill(int(pid_str), signal.SIGTERM)
+            _terminate_pid(int(pid_str))
         except OSError:
             pass
         print(f"stopped: pid={pid_str}")
@@ -1149,46 +1349,59 @@ def cmd_stop(argv: list[str]) -> None:
         print("not running")
 
 
+def _pause_resume_rows(rows: list[dict[str, str]], pause: bool, report_skipped: bool) -> int:
+    """SIGSTOP (*pause*) or SIGCONT the watcher rows not already in that state.
+
+    Every signal is sent before any output is written, so watchers late in a
+    long listing are not kept waiting on terminal I/O.  Returns the number
+    of rows that needed a signal.
+    """
+    if pause:
+        sig, done, verb, skipped = signal.SIGSTOP, "paused", "pause", "already paused"
+    else:
+        sig, done, verb, skipped = signal.SIGCONT, "resumed", "resume", "not paused"
+    out: list[str] = []
+    err: list[str] = []
+    acted = 0
+    for r in rows:
+        pid_str = r["pid"]
+        if not pid_str.isdigit():
+            continue
+        if _row_is_stopped(r) == pause:
+            if report_skipped:
+                out.append(f"{skipped}: pane={r['pane']} pid={pid_str}")
+            continue
+        acted += 1
+        try:
+            _signal_pid(int(pid_str), sig)
+            out.append(f"{done}: pane={r['pane']} pid={pid_str}")
+        except OSError as e:
+            err.append(f"error: could not {verb} pid={pid_str}: {e}")
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
+    if err:
+        sys.stderr.write("\n".join(err) + "\n")
+    return acted
+
+
 def cmd_pause(argv: list[str]) -> None:
     """Pause watcher(s) by sending SIGSTOP."""
     pane_arg = argv[0] if argv else ""
 
     if pane_arg and pane_arg != "*":
         pane = resolve_pane_target(pane_arg)
-        pids = watcher_pids_for_pane(pane)
-        if not pids:
+        rows = watcher_rows(pane)
+        if not rows:
             print(f"not running: pane={pane}")
             return
-        for pid_str in pids:
-            pid = int(pid_str)
-            if _is_pid_stopped(pid):
-                print(f"already paused: pane={pane} pid={pid_str}")
-            else:
-                try:
-                    os.kill(pid, signal.SIGSTOP)
-                    print(f"paused: pane={pane} pid={pid_str}")
-                except OSError as e:
-                    print(f"error: could not pause pid={pid_str}: {e}", file=sys.stderr)
+        _pause_resume_rows(rows, pause=True, report_skipped=True)
         return
 
-    had_any = False
-    for r in watcher_rows():
-        pid_str = r["pid"]
-        if not pid_str.isdigit():
-            continue
-        had_any = True
-        pid = int(pid_str)
-        if _is_pid_stopped(pid):
-            print(f"already paused: pane={r['pane']} pid={pid_str}")
-        else:
-            try:
-                os.kill(pid, signal.SIGSTOP)
-                print(f"paused: pane={r['pane']} pid={pid_str}")
-            except OSError as e:
-                print(f"error: could not pause pid={pid_str}: {e}", file=sys.stderr)
-
-    if not had_any:
+    rows = watcher_rows()
+    if not rows:
         print("not running")
+        return
+    _pause_resume_rows(rows, pause=True, report_skipped=True)
 
 
 def cmd_resume(argv: list[str]) -> None:
@@ -1197,45 +1410,23 @@ def cmd_resume(argv: list[str]) -> None:
 
     if pane_arg and pane_arg != "*":
         pane = resolve_pane_target(pane_arg)
-        pids = watcher_pids_for_pane(pane)
-        if not pids:
+        rows = watcher_rows(pane)
+        if not rows:
             print(f"not running: pane={pane}")
             return
-        for pid_str in pids:
-            pid = int(pid_str)
-            if not _is_pid_stopped(pid):
-                print(f"not paused: pane={pane} pid={pid_str}")
-            else:
-                try:
-                    os.kill(pid, signal.SIGCONT)
-                    print(f"resumed: pane={pane} pid={pid_str}")
-                except OSError as e:
-                    print(f"error: could not resume pid={pid_str}: {e}", file=sys.stderr)
+        _pause_resume_rows(rows, pause=False, report_skipped=True)
         return
 
-    had_any = False
-    for r in watcher_rows():
-        pid_str = r["pid"]
-        if not pid_str.isdigit():
-            continue
-        pid = int(pid_str)
-        if not _is_pid_stopped(pid):
-            continue
-        had_any = True
-        try:
-            os.kill(pid, signal.SIGCONT)
-            print(f"resumed: pane={r['pane']} pid={pid_str}")
-        except OSError as e:
-            print(f"error: could not resume pid={pid_str}: {e}", file=sys.stderr)
-
-    if not had_any:
+    if not _pause_resume_rows(watcher_rows(), pause=False, report_skipped=False):
         print("no paused watchers")
 
 
 def _restart_panes(panes: list[str]) -> None:
     restarted = 0
+    # One list-panes for the liveness check instead of a display-message per pane.
+    live_panes = _build_pane_window_map()
     for pane in panes:
-        if run_tmux("display-message", "-p", "-t", pane, "#{pane_id}") is None:
+        if pane not in live_panes:
             stop_pane_watchers(pane)
             continue
 
@@ -1253,8 +1444,16 @@ def _restart_one(target: str, pane: str, rest: list[str]) -> None:
 
     thread_arg, msg_mode, msg_value, msg_explicit = parse_thread_and_message_args(rest)
 
+    # Detect once: both the saved message and the thread argument need the
+    # pane's thread, and each lookup walks the process tree and state DB.
+    detected_tid = ""
+    if not msg_explicit or not thread_arg:
+        detected_tid = (
+            detect_thread_id_for_pane(pane) or thread_from_running_watcher_for_pane(pane) or ""
+        )
+
     if not msg_explicit:
-        tid = detect_thread_id_for_pane(pane) or thread_from_running_watcher_for_pane(pane) or ""
+        tid = detected_tid
         if tid and is_thread_id(tid):
             ss = _read_session_state(tid)
             msg = ss.get("message", "")
@@ -1265,9 +1464,7 @@ def _restart_one(target: str, pane: str, rest: list[str]) -> None:
         msg_value = DEFAULT_MSG_FILE
 
     if not thread_arg:
-        thread_arg = detect_thread_id_for_pane(pane) or ""
-        if not thread_arg:
-            thread_arg = thread_from_running_watcher_for_pane(pane) or ""
+        thread_arg = detected_tid
 
     stop_pane_watchers(pane)
 
@@ -1350,50 +1547,34 @@ def cmd_edit(argv: list[str]) -> None:
 
 
 def _build_pane_window_map() -> dict[str, str]:
-    listing = run_tmux("list-panes", "-a", "-F", "#{session_name}\t#{window_index}\t#{window_name}\t#{pane_id}")
     mapping: dict[str, str] = {}
-    if listing:
-        for line in listing.splitlines():
-            parts = line.split("\t")
-            if len(parts) >= 4 and parts[3]:
-                mapping[parts[3]] = f"{parts[0]}:{parts[1]}:{parts[2]}"
+    for r in _list_panes() or []:
+        if r.pane_id:
+            mapping[r.pane_id] = f"{r.session}:{r.window_index}:{r.window_name}"
     return mapping
 
 
-def _threads_from_pstree(shell_pid: str) -> list[str]:
+def _threads_from_process_tree(shell_pid: str, children: dict[str, list[str]]) -> list[str]:
     """Walk a process tree and return thread_ids from any codex processes found."""
-    try:
-        result = subprocess.run(
-            ["pstree", "-p", shell_pid],
-            capture_output=True, text=True, check=False,
-        )
-        if result.returncode != 0:
-            return []
-    except FileNotFoundError:
-        return []
-    threads: list[str] = []
-    for pid in re.findall(r"\((\d+)\)", result.stdout):
+    for pid in process_tree(shell_pid, children):
         tid = _thread_from_codex_pid(pid)
         if tid:
-            threads.append(tid)
-            break  # one codex per tree is enough
-    return threads
+            return [tid]  # one codex per tree is enough
+    return []
 
 
 def _build_thread_pane_map() -> dict[str, str]:
     """Map thread_id -> current tmux pane_id by scanning pane process trees."""
-    listing = run_tmux("list-panes", "-a", "-F", "#{pane_id}\t#{pane_pid}")
+    panes = _list_panes()
     mapping: dict[str, str] = {}
-    if listing:
-        for line in listing.splitlines():
-            parts = line.strip().split("\t")
-            if len(parts) < 2:
-                continue
-            pane_id, shell_pid = parts[0], parts[1]
-            if not pane_id or not shell_pid.isdigit():
+    if panes:
+        # One ps snapshot serves every pane instead of a pstree per pane.
+        children = process_children()
+        for r in panes:
+            if not r.pane_id or not r.pane_pid.isdigit():
                 continue
-            for tid in _threads_from_pstree(shell_pid):
-                mapping[tid] = pane_id
+            for tid in _threads_from_process_tree(r.pane_pid, children):
+                mapping[tid] = r.pane_id
     return mapping
 
 
@@ -1412,7 +1593,7 @@ def _thread_title(thread_id: str) -> str:
     state_dir = Path(STATE_DIR)
     if not state_dir.is_dir():
         return ""
-    for db_path in sorted(state_dir.glob("state_*.sqlite"), key=lambda p: p.stat().st_mtime, reverse=True):
+    for db_path in state_db_paths(state_dir):
         try:
             conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
         except sqlite3.Error:
@@ -1534,16 +1715,12 @@ def _last_agent_snippet_for_pane(pane: str, thread_id: str = "") -> str:
 def _read_state_json(state_path: str) -> dict[str, str]:
     """Read health fields from state JSON file."""
     result: dict[str, str] = {}
-    if not state_path or not os.path.isfile(state_path):
+    if not state_path:
         return result
-    try:
-        with open(state_path) as f:
-            data = json.load(f)
-        for k in ("health", "health_detail", "health_ts", "last_continue_at", "window_name", "thread_id"):
-            if k in data:
-                result[k] = str(data[k])
-    except (OSError, json.JSONDecodeError):
-        pass
+    data = _read_json_file(state_path)
+    for k in ("health", "health_detail", "health_ts", "last_continue_at", "window_name", "thread_id"):
+        if k in data:
+            result[k] = str(data[k])
     return result
 
 
@@ -1575,7 +1752,7 @@ def _short_thread_id(thread_id: str) -> str:
 def _compute_state(r: dict[str, str], sj: dict[str, str]) -> str:
     """Derive display state from process status and health JSON."""
     pid = r.get("pid", "")
-    if pid and pid.isdigit() and _is_pid_stopped(int(pid)):
+    if pid and _row_is_stopped(r):
         return "paused"
     # No running watcher process.
     if not pid:
@@ -1654,7 +1831,7 @@ def _clamp_visual_lines(text: str, max_lines: int, col_width: int) -> str:
 
 
 def _strip_rich_markup(text: str) -> str:
-    return re.sub(r"\[/?[^\]]*\]", "", text)
+    return _RICH_MARKUP_RE.sub("", text)
 
 
 def _status_table_plain(rows_data: list[tuple[str, str, str, str, str, str]]) -> None:
@@ -1675,13 +1852,14 @@ def _status_table_plain(rows_data: list[tuple[str, str, str, str, str, str]]) ->
             return cell[: width - 1] + "…"
         return cell.ljust(width)
 
-    print("  ".join(_fmt(header, widths[i]) for i, header in enumerate(headers)))
-    print("  ".join("-" * widths[i] for i in range(len(headers))))
-    separator = "  ".join("-" * widths[i] for i in range(len(headers)))
+    # Build the whole table and write it once rather than a print per row.
+    separator = "  ".join("-" * width for width in widths)
+    lines = ["  ".join(_fmt(header, widths[i]) for i, header in enumerate(headers)), separator]
     for idx, row in enumerate(plain_rows, 1):
-        print("  ".join(_fmt(cell, widths[i]) for i, cell in enumerate(row)))
+        lines.append("  ".join(_fmt(cell, widths[i]) for i, cell in enumerate(row)))
         if idx % _STATUS_SECTION_EVERY == 0 and idx != len(plain_rows):
-            print(separator)
+            lines.append(separator)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _status_target_for_row(row: dict[str, str], current_pane: str, window_label: str) -> str:
@@ -1703,7 +1881,7 @@ def _sort_session_key(session_name: str) -> tuple[int, object]:
 
 def _status_sort_key(item: tuple[dict[str, str], str, str]) -> tuple[tuple[int, object], int, int, str]:
     row, current_pane, window_label = item
-    match = re.match(r"([^:]+):(\d+):", window_label)
+    match = _WINDOW_LABEL_RE.match(window_label)
     if match:
         session_name = match.group(1)
         window_index = int(match.group(2))
@@ -1794,7 +1972,7 @@ def _status_table(resolved: list[tuple[dict[str, str], str, str]]) -> None:
         for i in range(5):
             # Measure first line only, strip rich markup tags.
             text = row[i].split("\n")[0]
-            text = re.sub(r"\[/?[^\]]*\]", "", text)
+            text = _strip_rich_markup(text)
             col_widths[i] = max(col_widths[i], len(text))
     # Rich table overhead: borders (7 │) + padding (2 per col × 6 = 12) = 19
     msg_col_w = max(20, min(60, term_w - sum(col_widths) - 19))
@@ -1832,8 +2010,7 @@ def _status_details(resolved: list[tuple[dict[str, str], str, str]]) -> None:
         last_event = "-"
         if r["watch"]:
             try:
-                with open(r["watch"]) as f:
-                    lines = f.readlines()
+                lines = _tail_lines(r["watch"], 1)
                 if lines:
                     last_event = lines[-1].rstrip("\n")
             except OSError:
@@ -1882,12 +2059,8 @@ def _status_details(resolved: list[tuple[dict[str, str], str, str]]) -> None:
 def _load_sessions() -> list[dict[str, str]]:
     """Load all sessions from session state files (keyed by thread_id)."""
     candidates: list[dict[str, str]] = []
-    for sf in glob.glob(os.path.join(STATE_DIR, "acw_session.*.json")):
-        try:
-            with open(sf) as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError):
-            continue
+    for sf in _state_files("acw_session.", ".json"):
+        data = _read_json_file(sf)
         thread_id = data.get("thread_id", "")
         if not thread_id or not is_thread_id(thread_id):
             continue
@@ -2029,7 +2202,7 @@ def _doctor_resolve_target(target: str) -> tuple[str, str]:
     if is_pane_id(target):
         return target, ""
 
-    if re.fullmatch(r"\d+", target) or re.fullmatch(r"[^:]+:\d+", target):
+    if _WINDOW_TARGET_RE.fullmatch(target):
         pane = resolve_pane_from_window_target(target)
         if pane and is_pane_id(pane):
             return pane, ""
@@ -2229,10 +2402,16 @@ def cmd_cleanup(argv: list[str]) -> None:
 
 def cleanup_stale_files() -> None:
     """Remove files for watchers that are no longer running."""
+    # One directory read serves every file class below (previously one glob
+    # per pattern, each re-reading STATE_DIR).
+    names = _state_dir_names()
+
     # PID files for dead processes.
-    for pf in glob.glob(os.path.join(STATE_DIR, "auto_continue_logwatch.*.pid")):
-        if not is_running_pid_file(pf):
-            Path(pf).unlink(missing_ok=True)
+    for name in names:
+        if name.startswith("auto_continue_logwatch.") and name.endswith(".pid"):
+            pf = os.path.join(STATE_DIR, name)
+            if not is_running_pid_file(pf):
+                Path(pf).unlink(missing_ok=True)
 
     # Build set of live watcher keys/threads (single ps scan).
     live_keys: set[str] = set()
@@ -2245,25 +2424,23 @@ def cleanup_stale_files() -> None:
         if tid:
             live_threads.add(tid.lower())
 
-    # Log files for dead watchers.
+    # Log files (watch and runner) for dead watchers.
     keep_logs: set[str] = set()
     for k in live_keys:
         keep_logs.add(watch_log_for_key(k))
         keep_logs.add(run_log_for_key(k))
-    for pat in (
-        os.path.join(STATE_DIR, "auto_continue_logwatch*.log"),
-        os.path.join(STATE_DIR, "auto_continue_logwatch*.runner.log"),
-    ):
-        for lf in glob.glob(pat):
+    for name in names:
+        if name.startswith("auto_continue_logwatch") and name.endswith(".log"):
+            lf = os.path.join(STATE_DIR, name)
             if lf not in keep_logs:
                 Path(lf).unlink(missing_ok=True)
 
     # Session files for threads without a running watcher.
-    for sf in glob.glob(os.path.join(STATE_DIR, "acw_session.*.json")):
-        base = os.path.basename(sf)
-        tid = base.removeprefix("acw_session.").removesuffix(".json")
-        if tid.lower() not in live_threads:
-            Path(sf).unlink(missing_ok=True)
+    for name in names:
+        if name.startswith("acw_session.") and name.endswith(".json"):
+            tid = name.removeprefix("acw_session.").removesuffix(".json")
+            if tid.lower() not in live_threads:
+                Path(os.path.join(STATE_DIR, name)).unlink(missing_ok=True)
 
 
 # ---------------------------------------------------------------------------
@@ -2292,8 +2469,8 @@ def main() -> None:
 
     # Only clean up stale files on commands that mutate state.  Read-only
     # commands (status, pause, resume) skip the cleanup overhead (ps scan +
-    # multiple globs).
-    if subcmd in ("start", "stop", "restart", "edit", "cleanup"):
+    # state dir listing).  `cleanup` runs it itself after validating argv.
+    if subcmd in ("start", "stop", "restart", "edit"):
         cleanup_stale_files()
 
     commands = {
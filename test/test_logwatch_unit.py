@@ -1,6 +1,9 @@
+import io
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 import sqlite3
 import os
 from unittest.mock import patch
@@ -19,6 +22,19 @@ TURN = "019cd7fb-f4cf-7512-8325-dae60d5294e4"
 
 
 class LogwatchUnitTests(unittest.TestCase):
+    def setUp(self):
+        # Control-client and server-fallback state must not leak between tests.
+        for name, value in (
+            ("_TMUX_CONTROL", None),
+            ("_TMUX_CONTROL_TARGET", ""),
+            ("_TMUX_CONTROL_RETRY_AT", 0.0),
+            ("_TMUX_FALLBACK_ENV", None),
+            ("_TMUX_FALLBACK_UNTIL", 0.0),
+        ):
+            patcher = patch.object(logwatch, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def test_thread_times_from_state_db_reads_threads_and_logs(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             os.chmod(tmpdir, 0o700)
@@ -173,6 +189,63 @@ class LogwatchUnitTests(unittest.TestCase):
             with patch.object(logwatch, "_process_start_epoch", return_value=100.0):
                 self.assertIsNone(logwatch._thread_from_state_db_pid("222", Path(tmpdir)))
 
+    def test_process_start_epoch_handles_spaces_in_comm(self):
+        # starttime (field 22) is 250 ticks after boot.
+        stat = "123 (tmux: server) S " + " ".join(["0"] * 18) + " 250 0 0\n"
+        with patch.object(logwatch, "_BOOT_CLOCK", (float("inf"), 1000.0, 100)):
+            with patch.object(Path, "read_text", return_value=stat):
+                self.assertEqual(1002.5, logwatch._process_start_epoch("123"))
+        self.assertIsNone(logwatch._process_start_epoch("abc"))
+
+    def test_boot_clock_is_rederived_after_its_ttl(self):
+        with patch.object(logwatch, "_BOOT_CLOCK", None), \
+                patch.object(Path, "read_text", return_value="50.00 10.00\n"), \
+                patch.object(logwatch.os, "sysconf", return_value=100) as sysconf, \
+                patch.object(logwatch.time, "monotonic", return_value=10.0) as mono, \
+                patch.object(logwatch.time, "time", return_value=1050.0) as wall:
+            self.assertEqual((1000.0, 100), logwatch._boot_clock())
+            # A wall-clock step inside the TTL is not picked up yet...
+            wall.return_value = 1110.0
+            self.assertEqual((1000.0, 100), logwatch._boot_clock())
+            # ...but is once the TTL has passed.
+            mono.return_value = 10.0 + logwatch.BOOT_CLOCK_TTL_SECS
+            self.assertEqual((1060.0, 100), logwatch._boot_clock())
+        sysconf.assert_called_once()
+
+    def test_process_tree_walks_one_proc_snapshot_depth_first(self):
+        ppids = {"1": "0", "100": "1", "101": "100", "102": "100", "110": "101", "200": "1"}
+        def fake_open(path, *args, **kwargs):
+            pid = str(path).split("/")[2]
+            if pid == "300":
+                raise FileNotFoundError(path)
+            return io.StringIO(f"{pid} (codex (tui)) S {ppids[pid]} 1 1 0\n")
+
+        entries = ["self", "300", *ppids]
+        with patch.object(logwatch.os, "listdir", return_value=entries):
+            with patch.object(logwatch, "open", side_effect=fake_open, create=True):
+                children = logwatch.process_children()
+        self.assertEqual(["100", "101", "110", "102"], logwatch.process_tree("100", children))
+        self.assertEqual(["999"], logwatch.process_tree("999", children))
+
+    def test_state_db_paths_reuses_listing_until_directory_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_dir = Path(tmpdir)
+            old = state_dir / "state_4.sqlite"
+            new = state_dir / "state_5.sqlite"
+            old.write_bytes(b"")
+            new.write_bytes(b"")
+            os.utime(old, (100, 100))
+            os.utime(new, (200, 200))
+            (state_dir / "acw_session.json").write_text("{}", encoding="utf-8")
+
+            self.assertEqual([new, old], logwatch.state_db_paths(state_dir))
+            with patch.object(Path, "glob", side_effect=AssertionError("relisted")):
+                os.utime(old, (300, 300))
+                self.assertEqual([old, new], logwatch.state_db_paths(state_dir))
+
+            new.unlink()
+            self.assertEqual([old], logwatch.state_db_paths(state_dir))
+
     def test_parse_codex_log_event_parses_post_sampling_line(self):
         line = (
             f"2026-03-10 INFO session_loop{{thread_id={THREAD}}}: codex_core::codex: "
@@ -180,6 +253,26 @@ class LogwatchUnitTests(unittest.TestCase):
         )
         self.assertEqual((THREAD, TURN, "false"), logwatch.parse_codex_log_event(line))
 
+    def test_parse_codex_log_event_post_sampling_requires_valid_fields(self):
+        prefix = f"2026-03-10 INFO session_loop{{thread_id={THREAD}}}: codex_core::codex: "
+        self.assertEqual(
+            (THREAD, TURN, "true"),
+            logwatch.parse_codex_log_event(
+                prefix + f"post sampling token usage turn_id={TURN} needs_follow_up=true"
+            ),
+        )
+        self.assertIsNone(
+            logwatch.parse_codex_log_event(
+                prefix + f"post sampling token usage turn_id={TURN} needs_follow_up=maybe"
+            )
+        )
+        self.assertIsNone(
+            logwatch.parse_codex_log_event(
+                "2026-03-10 INFO session_loop{thread_id=NOT-A-THREAD}: "
+                f"post sampling token usage turn_id={TURN} needs_follow_up=false"
+            )
+        )
+
     def test_parse_codex_log_event_parses_task_close_line(self):
         line = (
             f'2026-03-10T13:42:21Z INFO session_loop{{thread_id={THREAD}}}:'
@@ -189,6 +282,42 @@ class LogwatchUnitTests(unittest.TestCase):
         )
         self.assertEqual((THREAD, TURN, "false"), logwatch.parse_codex_log_event(line))
 
+    def test_parse_codex_log_event_task_close_turn_id_can_end_the_span(self):
+        line = (
+            f"2026-03-10T13:42:21Z INFO session_loop{{thread_id={THREAD}}}:"
+            f'turn{{otel.name="session_task.turn" turn.id={TURN}}}: '
+            "codex_core::tasks: close time.busy=23.7ms"
+        )
+        self.assertEqual((THREAD, TURN, "false"), logwatch.parse_codex_log_event(line))
+        self.assertIsNone(logwatch.parse_codex_log_event(line.replace("turn.id=", "turnXid=")))
+
+    def test_parse_codex_log_event_ignores_lines_without_completion_marker(self):
+        line = (
+            f"2026-03-10 INFO session_loop{{thread_id={THREAD}}}: codex_core::codex: "
+            f"sampling turn_id={TURN} needs_follow_up=false"
+        )
+        self.assertIsNone(logwatch.parse_codex_log_event(line))
+        self.assertIsNone(logwatch.parse_codex_log_interrupt(line))
+
+    def test_coalesce_completions_keeps_last_completion_per_run(self):
+        other = "019cd7fb-0000-7000-8000-000000000000"
+        done = lambda thread, turn: logwatch.CodexLogEvent("completion", thread, turn, "false")
+        busy = logwatch.CodexLogEvent("completion", THREAD, "t2", "true")
+        interrupt = logwatch.CodexLogEvent("interrupt", THREAD, detail="Conversation interrupted")
+        events = [
+            done(THREAD, "t1"),
+            busy,
+            done(other, "o1"),
+            done(THREAD, "t3"),
+            interrupt,
+            done(THREAD, "t4"),
+            done(THREAD, "t5"),
+        ]
+        self.assertEqual(
+            [busy, done(other, "o1"), done(THREAD, "t3"), interrupt, done(THREAD, "t5")],
+            logwatch.coalesce_completions(events),
+        )
+
     def test_parse_codex_log_interrupt_parses_interrupt_line(self):
         line = (
             f'2026-03-10T13:42:21Z INFO session_loop{{thread_id={THREAD}}}:'
@@ -262,6 +391,21 @@ class LogwatchUnitTests(unittest.TestCase):
         finally:
             log_path.unlink(missing_ok=True)
 
+    def test_iter_lines_reversed_reassembles_lines_across_blocks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "codex-tui.log"
+            log_path.write_bytes(b"first line\nsecond\nthird line\n")
+            with log_path.open("rb") as f, patch.object(logwatch, "CODEX_READ_CHUNK", 4):
+                size = log_path.stat().st_size
+                self.assertEqual(
+                    [b"", b"third line", b"second", b"first line"],
+                    list(logwatch._iter_lines_reversed(f, size, size)),
+                )
+                self.assertEqual(
+                    [b"", b"third line", b"nd"],
+                    list(logwatch._iter_lines_reversed(f, size, 14)),
+                )
+
     def test_check_codex_log_tail_for_pending_skips_if_thread_has_newer_activity(self):
         newer_line = (
             f"2026-03-10T13:42:22Z INFO session_loop{{thread_id={THREAD}}}: "
@@ -289,6 +433,139 @@ class LogwatchUnitTests(unittest.TestCase):
         finally:
             log_path.unlink(missing_ok=True)
 
+    def test_read_complete_lines_holds_back_partial_line_until_newline(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "codex-tui.log"
+            log_path.write_bytes("one\ntwo é\nthr".encode("utf-8"))
+            with log_path.open("rb", buffering=0) as fh, patch.object(logwatch, "CODEX_READ_CHUNK", 4):
+                lines, pending, read_any = logwatch.read_complete_lines(fh, b"")
+                self.assertEqual(lines, [b"one", "two é".encode("utf-8")])
+                self.assertEqual(pending, b"thr")
+                self.assertTrue(read_any)
+
+                with log_path.open("ab") as out:
+                    out.write(b"ee\n")
+                lines, pending, read_any = logwatch.read_complete_lines(fh, pending)
+                self.assertEqual(lines, [b"three"])
+                self.assertEqual(pending, b"")
+
+                self.assertEqual(logwatch.read_complete_lines(fh, pending), ([], b"", False))
+
+    def test_read_complete_lines_stops_after_a_short_read(self):
+        reads = []
+
+        def fake_read(size):
+            reads.append(size)
+            return [b"a" * size, b"b\n", b"never\n"][len(reads) - 1]
+
+        with patch.object(logwatch, "CODEX_READ_CHUNK", 4):
+            lines, pending, read_any = logwatch.read_complete_lines(SimpleNamespace(read=fake_read), b"")
+        self.assertEqual(([b"aaaab"], b"", True), (lines, pending, read_any))
+        self.assertEqual([4, 4], reads)
+
+    def test_read_complete_lines_with_marker_returns_only_matching_lines(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "codex-tui.log"
+            log_path.write_bytes(
+                b"noise\nINFO session_loop{a} one\nnoise session\n"
+                b"session_loop{b} two\nINFO session_loop{c} thr"
+            )
+            with log_path.open("rb", buffering=0) as fh:
+                lines, pending, _ = logwatch.read_complete_lines(fh, b"", b"session_loop{")
+        self.assertEqual([b"INFO session_loop{a} one", b"session_loop{b} two"], lines)
+        self.assertEqual(b"INFO session_loop{c} thr", pending)
+
+    def test_now_ts_formats_once_per_second(self):
+        with patch.object(logwatch, "_NOW_TS_CACHE", (-1, "")):
+            with patch.object(logwatch.time, "time", side_effect=[100.2, 100.9, 101.0]):
+                with patch.object(logwatch.time, "strftime", side_effect=["first", "second"]) as fmt:
+                    self.assertEqual(
+                        ["first", "first", "second"],
+                        [logwatch.now_ts(), logwatch.now_ts(), logwatch.now_ts()],
+                    )
+        self.assertEqual(2, fmt.call_count)
+
+    def test_check_log_rotation_defers_within_rate_limit_then_sees_new_inode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            log_path = Path(tmpdir) / "codex-tui.log"
+            log_path.write_bytes(b"old line\n")
+            with log_path.open("rb", buffering=0) as fh:
+                fh.read()
+                ino = os.fstat(fh.fileno()).st_ino
+                check = logwatch.check_log_rotation
+                self.assertEqual(("same", 100.0), check(log_path, fh, ino, 0.0, 100.0))
+
+                replacement = Path(tmpdir) / "codex-tui.log.new"
+                replacement.write_bytes(b"a longer first line of the new log\n")
+                os.replace(replacement, log_path)
+                # Inside the rate limit the check is only deferred, not lost.
+                self.assertEqual(("deferred", 100.0), check(log_path, fh, ino, 100.0, 101.0))
+                due = 100.0 + logwatch.ROTATION_CHECK_SECS + 0.5
+                self.assertEqual(("replaced", due), check(log_path, fh, ino, 100.0, due))
+
+                new_ino = os.stat(log_path).st_ino
+                log_path.write_bytes(b"")
+                self.assertEqual("replaced", check(log_path, fh, new_ino, 0.0, 200.0)[0])
+                log_path.unlink()
+                self.assertEqual(("gone", 300.0), check(log_path, fh, new_ino, 0.0, 300.0))
+
+    def test_append_log_reuses_one_line_buffered_handle(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chmod(tmpdir, 0o700)
+            log_path = Path(tmpdir) / "nested" / "watch.log"
+            try:
+                with patch.object(logwatch, "now_ts", return_value="2026-03-11 12:34:56"):
+                    logwatch.append_log(log_path, "first")
+                    handle = logwatch._LOG_HANDLES[log_path]
+                    self.assertEqual(
+                        "[2026-03-11 12:34:56] first\n",
+                        log_path.read_text(encoding="utf-8"),
+                    )
+                    logwatch.append_log(log_path, "second")
+                self.assertIs(handle, logwatch._LOG_HANDLES[log_path])
+                self.assertEqual(
+                    ["[2026-03-11 12:34:56] first", "[2026-03-11 12:34:56] second"],
+                    log_path.read_text(encoding="utf-8").splitlines(),
+                )
+            finally:
+                logwatch._close_log_handles()
+
+    def test_append_log_recreates_log_deleted_under_open_handle(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chmod(tmpdir, 0o700)
+            log_path = Path(tmpdir) / "watch.log"
+            try:
+                with patch.object(logwatch, "now_ts", return_value="2026-03-11 12:34:56"):
+                    logwatch.append_log(log_path, "before")
+                    log_path.unlink()
+                    logwatch._reopen_unlinked_log_handles()
+                    self.assertNotIn(log_path, logwatch._LOG_HANDLES)
+                    logwatch.append_log(log_path, "after")
+                self.assertEqual(
+                    "[2026-03-11 12:34:56] after\n",
+                    log_path.read_text(encoding="utf-8"),
+                )
+            finally:
+                logwatch._close_log_handles()
+
+    def test_write_state_skips_rewrite_when_state_is_unchanged(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chmod(tmpdir, 0o700)
+            state_path = Path(tmpdir) / "state" / "acw_session.json"
+            state = {"thread_id": THREAD, "last_handled_turn": TURN}
+            logwatch.write_state(state_path, state)
+            self.assertEqual(state, logwatch.read_state(state_path))
+
+            with patch.object(logwatch.os, "replace") as replace:
+                logwatch.write_state(state_path, dict(state))
+            replace.assert_not_called()
+
+            state["health"] = "warn"
+            logwatch.write_state(state_path, state)
+            self.assertEqual("warn", logwatch.read_state(state_path)["health"])
+            self.assertEqual(["acw_session.json"], os.listdir(state_path.parent))
+            self.assertEqual(0o600, os.stat(state_path).st_mode & 0o777)
+
     def test_check_pane_for_interrupt_matches_conversation_interrupted(self):
         text = (
             "■ Conversation interrupted - tell the model what to do differently.\n"
@@ -318,6 +595,15 @@ class LogwatchUnitTests(unittest.TestCase):
         with patch.object(logwatch, "tmux_capture_pane", return_value=text):
             self.assertIsNone(logwatch.check_pane_for_interrupt("%11"))
 
+    def test_check_pane_for_interrupt_matches_banner_repeated_after_prompt(self):
+        text = (
+            "■ Conversation interrupted - tell the model what to do differently.\n"
+            "› try again\n"
+            "■ Conversation interrupted - tell the model what to do differently.\n"
+        )
+        with patch.object(logwatch, "tmux_capture_pane", return_value=text):
+            self.assertEqual("Conversation interrupted", logwatch.check_pane_for_interrupt("%11"))
+
     def test_check_pane_for_errors_ignores_interrupt_banner(self):
         text = (
             "■ Conversation interrupted - tell the model what to do differently.\n"
@@ -335,6 +621,23 @@ class LogwatchUnitTests(unittest.TestCase):
             reason = logwatch.check_pane_for_errors("%11")
         self.assertEqual("Authentication failed", reason)
 
+    def test_check_pane_reports_interrupt_and_error_from_one_capture(self):
+        with patch.object(
+            logwatch,
+            "tmux_capture_pane",
+            return_value="■ Conversation interrupted - tell the model what to do differently.\n",
+        ) as capture:
+            self.assertEqual(("Conversation interrupted", None), logwatch.check_pane("%11"))
+        capture.assert_called_once()
+
+        with patch.object(
+            logwatch,
+            "tmux_capture_pane",
+            return_value="■ You've hit your usage limit.\n",
+        ) as capture:
+            self.assertEqual((None, "usage limit"), logwatch.check_pane("%11"))
+        capture.assert_called_once()
+
     def test_auto_pause_current_watcher_stops_process_for_error_banner(self):
         state = {"thread_id": THREAD, "message": "continue"}
         with patch.object(logwatch, "append_log") as append_log:
@@ -362,28 +665,203 @@ class LogwatchUnitTests(unittest.TestCase):
             return subprocess.CompletedProcess(args, 0, "", "")
 
         with patch.object(logwatch, "run_tmux", side_effect=fake_run_tmux):
-            with patch.object(logwatch, "tmux_cancel_mode_if_needed"):
-                with patch.object(logwatch.time, "sleep"):
-                    result = logwatch.tmux_send(
-                        "%11",
-                        "continue",
-                        0.1,
-                        interrupt_checker=lambda: "Conversation interrupted",
-                    )
+            with patch.object(logwatch.time, "sleep"):
+                result = logwatch.tmux_send(
+                    "%11",
+                    "continue",
+                    0.1,
+                    interrupt_checker=lambda: "Conversation interrupted",
+                )
 
         self.assertEqual("interrupted", result.status)
         self.assertEqual("Conversation interrupted", result.detail)
-        send_key_calls = [cmd for cmd, _ in calls if cmd[:3] == ["send-keys", "-t", "%11"]]
-        self.assertIn(["send-keys", "-t", "%11", "-l", "continue"], send_key_calls)
-        self.assertFalse(any(cmd[-1] == "C-m" for cmd in send_key_calls))
+        self.assertEqual(2, len(calls))
+        self.assertEqual(["send-keys", "-t", "%11", "-l", "continue"], calls[1][0])
+        self.assertFalse(any(cmd[-1] == "C-m" for cmd, _ in calls))
 
-    def test_run_tmux_falls_back_when_explicit_socket_is_stale(self):
+    def test_tmux_send_without_enter_delay_uses_one_chained_tmux_call(self):
+        calls = []
+
+        def fake_run_tmux(args, capture_output=True):
+            calls.append(list(args))
+            return subprocess.CompletedProcess(args, 0, "", "")
+
+        with patch.object(logwatch, "run_tmux", side_effect=fake_run_tmux):
+            result = logwatch.tmux_send("%11", "continue;", 0.0, interrupt_checker=lambda: None)
+
+        self.assertEqual("ok", result.status)
+        self.assertEqual(
+            [
+                ["display-message", "-p", "-t", "%11", "#{pane_in_mode}"],
+                ["send-keys", "-t", "%11", "-l", "continue\\;", ";", "send-keys", "-t", "%11", "C-m"],
+            ],
+            calls,
+        )
+
+    def test_tmux_send_leaves_copy_mode_before_sending(self):
+        calls = []
+
+        def fake_run_tmux(args, capture_output=True):
+            calls.append(list(args))
+            out = "1\n" if args[0] == "display-message" else ""
+            return subprocess.CompletedProcess(args, 0, out, "")
+
+        with patch.object(logwatch, "run_tmux", side_effect=fake_run_tmux):
+            result = logwatch.tmux_send("%11", "continue", 0.0)
+
+        self.assertEqual("ok", result.status)
+        self.assertEqual(["send-keys", "-t", "%11", "-X", "cancel"], calls[1])
+        self.assertEqual("send-keys", calls[2][0])
+
+    @unittest.skipUnless(shutil.which("tmux"), "tmux unavailable")
+    def test_tmux_control_replies_stay_in_step_after_send_to_pane_in_copy_mode(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sock = os.path.join(tmpdir, "tmux.sock")
+            tmux = ["tmux", "-S", sock]
+            subprocess.run(tmux + ["new-session", "-d", "-x", "80", "-y", "20", "cat"], check=True)
+            self.addCleanup(subprocess.run, tmux + ["kill-server"], capture_output=True)
+            pane = subprocess.run(
+                tmux + ["display-message", "-p", "#{pane_id}"],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+            subprocess.run(tmux + ["copy-mode", "-t", pane], check=True)
+            env = {k: v for k, v in os.environ.items() if k not in ("TMUX", "TMUX_PANE")}
+            env["AUTO_CONTINUE_TMUX_SOCKET"] = sock
+            with patch.dict(os.environ, env, clear=True):
+                try:
+                    self.assertTrue(logwatch.start_tmux_control(pane))
+                    self.assertEqual("ok", logwatch.tmux_send(pane, "hello", 0.0).status)
+                    mode = logwatch.run_tmux(["display-message", "-p", "-t", pane, "#{pane_in_mode}"])
+                    pane_id = logwatch.run_tmux(["display-message", "-p", "-t", pane, "#{pane_id}"])
+                    self.assertIsNotNone(logwatch._TMUX_CONTROL)
+                finally:
+                    logwatch.stop_tmux_control()
+        self.assertEqual("0\n", mode.stdout)
+        self.assertEqual(f"{pane}\n", pane_id.stdout)
+
+    def test_split_tmux_argv_follows_tmux_semicolon_rules(self):
+        self.assertEqual(
+            [
+                ["send-keys", "-t", "%11", "-l", "continue;"],
+                ["send-keys", "-t", "%11", "C-m"],
+            ],
+            logwatch._split_tmux_argv(
+                ["send-keys", "-t", "%11", "-l", "continue\\;", ";", "send-keys", "-t", "%11", "C-m"]
+            ),
+        )
+        self.assertEqual([["a"], ["b"]], logwatch._split_tmux_argv(["a;", "b"]))
+
+    def test_tmux_control_quote_escapes_expansions_and_newlines(self):
+        self.assertEqual(
+            '"a\\"b\\$HOME\\\\x\\nnext\\033"',
+            logwatch._tmux_control_quote('a"b$HOME\\x\nnext\x1b'),
+        )
+
+    def test_tmux_control_run_reads_own_frames_and_skips_notifications(self):
+        read_fd, write_fd = os.pipe()
+        stdin = io.BytesIO()
+        proc = SimpleNamespace(stdin=stdin, stdout=os.fdopen(read_fd, "rb"))
+        os.write(
+            write_fd,
+            b"%begin 1 265 0\n%end 1 265 0\n%session-changed $0 t\n"
+            b"%begin 1 270 1\nline one\n%end 1 999 1\n%end 1 270 1\n"
+            b"%begin 1 271 1\ncan't find pane: %99\n%error 1 271 1\n",
+        )
+        os.close(write_fd)
+        control = logwatch.TmuxControl(proc)
+        try:
+            rc = control.run(["capture-pane", "-p", "-t", "%11", ";", "send-keys", "-t", "%99", "C-m"])
+        finally:
+            proc.stdout.close()
+
+        self.assertEqual(1, rc.returncode)
+        self.assertEqual("line one\n%end 1 999 1\n", rc.stdout)
+        self.assertEqual("can't find pane: %99\n", rc.stderr)
+        self.assertEqual(
+            b'"capture-pane" "-p" "-t" "%11"\n"send-keys" "-t" "%99" "C-m"\n',
+            stdin.getvalue(),
+        )
+
+    def test_tmux_control_open_attaches_by_session_id_not_pane(self):
+        resolved = subprocess.CompletedProcess(["tmux"], 0, "$3\n", "")
+        probe = subprocess.CompletedProcess(["tmux"], 0, "%12\n", "")
+        with patch.object(logwatch.subprocess, "run", return_value=resolved) as run, \
+                patch.object(logwatch.subprocess, "Popen") as popen, \
+                patch.object(logwatch.TmuxControl, "run", return_value=probe) as control_run:
+            control = logwatch.TmuxControl.open("%12", "/tmp/sock")
+        self.assertIsNotNone(control)
+        self.assertEqual(
+            ["tmux", "-S", "/tmp/sock", "display-message", "-p", "-t", "%12", "#{session_id}"],
+            run.call_args.args[0],
+        )
+        self.assertEqual(
+            ["tmux", "-S", "/tmp/sock", "-C", "attach-session", "-f", "ignore-size,no-output", "-t", "$3"],
+            popen.call_args.args[0],
+        )
+        control_run.assert_called_once_with(["display-message", "-p", "-t", "%12", "#{pane_id}"])
+
+    def test_tmux_control_open_gives_up_when_pane_session_is_unknown(self):
+        missing = subprocess.CompletedProcess(["tmux"], 1, "", "can't find pane")
+        with patch.object(logwatch.subprocess, "run", return_value=missing), \
+                patch.object(logwatch.subprocess, "Popen") as popen:
+            self.assertIsNone(logwatch.TmuxControl.open("%99"))
+        popen.assert_not_called()
+
+    def test_run_tmux_falls_back_to_subprocess_when_control_client_fails(self):
+        class DeadControl:
+            def run(self, args):
+                return None
+
+            def close(self):
+                pass
+
+        with patch.object(logwatch, "_TMUX_CONTROL", DeadControl()):
+            with patch.object(
+                logwatch.subprocess,
+                "run",
+                return_value=subprocess.CompletedProcess(["tmux"], 0, "%11\n", ""),
+            ) as run:
+                with patch.dict(logwatch.os.environ, {"PATH": "/usr/bin"}, clear=True):
+                    rc = logwatch.run_tmux(["display-message", "-p", "#{pane_id}"])
+            self.assertIsNone(logwatch._TMUX_CONTROL)
+
+        self.assertEqual("%11\n", rc.stdout)
+        run.assert_called_once()
+
+    def test_run_tmux_reattaches_dropped_control_client_after_retry_interval(self):
+        class LiveControl:
+            def run(self, args):
+                return subprocess.CompletedProcess(args, 0, "%12\n", "")
+
+            def close(self):
+                pass
+
+        opens = []
+
+        def fake_open(target, socket_path=""):
+            opens.append(target)
+            return LiveControl() if len(opens) > 1 else None
+
+        spawned = subprocess.CompletedProcess(["tmux"], 0, "spawned\n", "")
+        with patch.object(logwatch.TmuxControl, "open", side_effect=fake_open), \
+                patch.object(logwatch.subprocess, "run", return_value=spawned), \
+                patch.object(logwatch.time, "monotonic", return_value=100.0) as mono:
+            self.assertFalse(logwatch.start_tmux_control("%12"))
+            self.assertEqual("spawned\n", logwatch.run_tmux(["list-panes"]).stdout)
+            self.assertEqual(["%12"], opens)
+            mono.return_value = 100.0 + logwatch.TMUX_CONTROL_RETRY_SECS
+            self.assertEqual("%12\n", logwatch.run_tmux(["list-panes"]).stdout)
+            self.assertEqual(["%12", "%12"], opens)
+            logwatch.stop_tmux_control()
+            self.assertEqual("", logwatch._TMUX_CONTROL_TARGET)
+
+    def _run_tmux_against_explicit_socket(self, socket_error, commands, clock=None):
         calls = []
 
         def fake_run(cmd, capture_output=None, text=None, check=None, env=None):
             calls.append((cmd, env))
-            if len(calls) == 1:
-                return subprocess.CompletedProcess(cmd, 1, "", "stale socket")
+            if cmd[1] == "-S":
+                return subprocess.CompletedProcess(cmd, 1, "", socket_error)
             return subprocess.CompletedProcess(cmd, 0, "ok", "")
 
         env = {
@@ -392,15 +870,107 @@ class LogwatchUnitTests(unittest.TestCase):
             "TMUX_PANE": "%9",
             "PATH": "/usr/bin",
         }
-        with patch.dict(logwatch.os.environ, env, clear=True):
-            with patch.object(logwatch.subprocess, "run", side_effect=fake_run):
-                rc = logwatch.run_tmux(["list-sessions"])
+        results = []
+        with patch.dict(logwatch.os.environ, env, clear=True), \
+                patch.object(logwatch.subprocess, "run", side_effect=fake_run), \
+                patch.object(logwatch.time, "monotonic") as mono:
+            for command, now in zip(commands, clock or [100.0] * len(commands)):
+                mono.return_value = now
+                results.append(logwatch.run_tmux(command))
+        return calls, results
+
+    def test_run_tmux_falls_back_when_explicit_socket_is_stale(self):
+        retry_at = 100.0 + logwatch.TMUX_FALLBACK_RETRY_SECS
+        calls, results = self._run_tmux_against_explicit_socket(
+            "error connecting to /tmp/tmux-test/socket (No such file or directory)",
+            [["list-sessions"], ["list-panes"], ["list-windows"]],
+            clock=[100.0, 101.0, retry_at],
+        )
 
-        self.assertEqual(0, rc.returncode)
+        self.assertEqual(0, results[0].returncode)
         self.assertEqual(["tmux", "-S", "/tmp/tmux-test/socket", "list-sessions"], calls[0][0])
         self.assertEqual(["tmux", "list-sessions"], calls[1][0])
         self.assertNotIn("TMUX", calls[1][1])
         self.assertNotIn("TMUX_PANE", calls[1][1])
+        # Once the default server answered, the dead socket is not retried...
+        self.assertEqual(["tmux", "list-panes"], calls[2][0])
+        self.assertIs(calls[1][1], calls[2][1])
+        # ...until TMUX_FALLBACK_RETRY_SECS have passed.
+        self.assertEqual(["tmux", "-S", "/tmp/tmux-test/socket", "list-windows"], calls[3][0])
+
+    def test_run_tmux_command_failure_does_not_switch_servers(self):
+        calls, _ = self._run_tmux_against_explicit_socket(
+            "can't find pane: %99",
+            [["send-keys", "-t", "%99", "C-m"], ["list-panes"]],
+        )
+
+        self.assertEqual(["tmux", "send-keys", "-t", "%99", "C-m"], calls[1][0])
+        self.assertEqual(["tmux", "-S", "/tmp/tmux-test/socket", "list-panes"], calls[2][0])
+
+    def test_tmux_pane_getters_share_one_cached_display_message(self):
+        calls = []
+
+        def fake_run_tmux(args, *, capture_output=True):
+            calls.append(args)
+            if args[3] == "%1":
+                return subprocess.CompletedProcess(args, 0, "%1\t1\t4242\t3\tproj\t/tmp/a\tb\n", "")
+            return subprocess.CompletedProcess(args, 1, "", "can't find pane")
+
+        with patch.object(logwatch, "_PANE_STATUS_CACHE", {}):
+            with patch.object(logwatch, "run_tmux", side_effect=fake_run_tmux):
+                self.assertTrue(logwatch.tmux_pane_exists("%1"))
+                self.assertTrue(logwatch.tmux_pane_active("%1"))
+                self.assertEqual("3", logwatch.tmux_window_index("%1"))
+                self.assertEqual("/tmp/a\tb", logwatch.tmux_pane_cwd("%1"))
+                self.assertFalse(logwatch.tmux_pane_exists("%2"))
+                self.assertEqual("", logwatch.tmux_window_name("%2"))
+                self.assertEqual(2, len(calls))
+                with patch.object(logwatch, "PANE_STATUS_TTL_SECS", 0.0):
+                    self.assertEqual("4242", logwatch.tmux_pane_status("%1")["pane_pid"])
+                self.assertEqual(3, len(calls))
+
+    @unittest.skipUnless(logwatch._load_libc_inotify(), "inotify unavailable")
+    def test_inotify_observer_wakes_on_append_and_flags_rotation(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chmod(tmpdir, 0o700)
+            log_path = Path(tmpdir) / "codex-tui.log"
+            log_path.write_text("", encoding="utf-8")
+            wake = logwatch.threading.Event()
+            replaced = logwatch.threading.Event()
+            observer = logwatch._InotifyObserver.create(wake, {str(log_path)}, replaced)
+            self.assertIsNotNone(observer)
+            observer.schedule(None, tmpdir)
+            observer.start()
+            self.addCleanup(observer.join, 2.0)
+            self.addCleanup(observer.stop)
+
+            (Path(tmpdir) / "other.log").write_text("noise\n", encoding="utf-8")
+            self.assertFalse(wake.wait(0.2))
+            with log_path.open("a", encoding="utf-8") as f:
+                f.write("line\n")
+            self.assertTrue(wake.wait(2.0))
+            self.assertFalse(replaced.is_set())
+
+            wake.clear()
+            log_path.rename(Path(tmpdir) / "codex-tui.log.1")
+            self.assertTrue(replaced.wait(2.0))
+            self.assertTrue(wake.is_set())
+
+    def test_inotify_observer_treats_queue_overflow_as_rotation_and_stops(self):
+        read_fd, write_fd = os.pipe()
+        wake = logwatch.threading.Event()
+        replaced = logwatch.threading.Event()
+        observer = logwatch._InotifyObserver(None, read_fd, wake, set(), replaced)
+        observer.start()
+        os.write(write_fd, logwatch._INOTIFY_EVENT.pack(-1, logwatch._IN_Q_OVERFLOW, 0, 0))
+        self.assertTrue(replaced.wait(2.0))
+        self.assertTrue(wake.is_set())
+        observer.stop()
+        observer.join(2.0)
+        os.close(write_fd)
+        self.assertFalse(observer.is_alive())
+        with self.assertRaises(OSError):
+            os.fstat(read_fd)
 
     def test_compute_health_warns_when_waiting_for_thread_id_too_long(self):
         health, detail = logwatch.compute_health(
@@ -9,7 +9,6 @@ from contextlib import redirect_stderr
 from contextlib import redirect_stdout
 from pathlib import Path
 from unittest.mock import patch
-from unittest.mock import mock_open
 
 import sys
 
@@ -23,6 +22,13 @@ THREAD = "11111111-1111-1111-1111-111111111111"
 
 
 class WatchdUnitTests(unittest.TestCase):
+    def setUp(self):
+        # Per-invocation tmux/ps snapshots must not leak between tests.
+        for name, value in (("_PANE_ROWS", None), ("_WATCHER_PS_OUT", None), ("_RENAME_HOOK_INSTALLED", False)):
+            patcher = patch.object(acw, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     def test_main_help_prints_command_summary(self):
         out = io.StringIO()
         err = io.StringIO()
@@ -38,6 +44,13 @@ class WatchdUnitTests(unittest.TestCase):
         self.assertIn("Examples:", text)
         self.assertEqual("", err.getvalue())
 
+    def test_main_cleanup_runs_cleanup_once(self):
+        with patch.object(acw.sys, "argv", ["acw", "cleanup"]):
+            with patch.object(acw, "cleanup_stale_files") as cleanup:
+                with redirect_stdout(io.StringIO()):
+                    acw.main()
+        cleanup.assert_called_once_with()
+
     def test_main_help_uses_invoked_program_name(self):
         out = io.StringIO()
         with patch.object(acw.sys, "argv", ["acw", "--help"]):
@@ -54,9 +67,59 @@ class WatchdUnitTests(unittest.TestCase):
             self.assertTrue(Path(path).is_file())
             self.assertEqual(acw.DEFAULT_MESSAGE_TEXT, Path(path).read_text(encoding="utf-8"))
 
+    def test_resolve_project_cwd_finds_git_root_without_forking(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir).resolve()
+            (root / ".git").write_text("gitdir: elsewhere\n", encoding="utf-8")
+            sub = root / "a" / "b"
+            sub.mkdir(parents=True)
+            env = {k: v for k, v in os.environ.items() if k not in ("GIT_DIR", "GIT_WORK_TREE")}
+            env["AUTO_CONTINUE_PROJECT_CWD"] = ""
+            with patch.dict(os.environ, env, clear=True):
+                with patch.object(acw.Path, "cwd", return_value=sub):
+                    with patch.object(acw.subprocess, "check_output") as check_output:
+                        self.assertEqual(str(root), acw.resolve_project_cwd())
+        check_output.assert_not_called()
+
+    def test_resolve_project_cwd_asks_git_when_git_dir_is_set(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sub = Path(tmpdir).resolve() / "a"
+            sub.mkdir()
+            (sub / ".git").mkdir()
+            env = {"AUTO_CONTINUE_PROJECT_CWD": "", "GIT_DIR": "/srv/repo.git", "GIT_WORK_TREE": "/srv/work"}
+            with patch.dict(os.environ, env):
+                with patch.object(acw.Path, "cwd", return_value=sub):
+                    with patch.object(acw.subprocess, "check_output", return_value="/srv/work\n") as check_output:
+                        self.assertEqual("/srv/work", acw.resolve_project_cwd())
+        self.assertEqual(
+            ["git", "-C", str(sub), "rev-parse", "--show-toplevel"],
+            check_output.call_args.args[0],
+        )
+
     def test_short_thread_id_keeps_prefix_and_suffix(self):
         self.assertEqual("11111111…1111", acw._short_thread_id(THREAD))
 
+    def test_sanitize_key_replaces_unsafe_characters(self):
+        self.assertEqual("_6", acw.sanitize_key("%6"))
+        self.assertEqual("a.b_c-d_e", acw.sanitize_key("a.b_c-d e"))
+        self.assertEqual("caf_", acw.sanitize_key("café"))
+
+    def test_key_from_pane_memoizes_sanitized_key(self):
+        with patch.object(acw, "_PANE_KEY_CACHE", {}):
+            self.assertEqual("_6", acw.key_from_pane("%6"))
+            with patch.object(acw, "sanitize_key", side_effect=AssertionError("recomputed")):
+                self.assertEqual("_6", acw.key_from_pane("%6"))
+
+    def test_tail_lines_reads_only_the_end_of_the_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "runner.log"
+            path.write_text("".join(f"line {i}\n" for i in range(100)), encoding="utf-8")
+            self.assertEqual(["line 98\n", "line 99\n"], acw._tail_lines(str(path), 2))
+            # A 20-byte window starts mid-line; the fragment is dropped.
+            self.assertEqual(["line 98\n", "line 99\n"], acw._tail_lines(str(path), 5, max_bytes=20))
+            path.write_text("", encoding="utf-8")
+            self.assertEqual([], acw._tail_lines(str(path), 2))
+
     def test_compute_state_shows_dead_without_live_pid_even_if_health_was_ok(self):
         self.assertEqual("dead", acw._compute_state({"pid": ""}, {"health": "ok"}))
 
@@ -139,10 +202,9 @@ class WatchdUnitTests(unittest.TestCase):
                         with patch.object(acw, "_read_state_json", return_value={}):
                             with patch.object(acw, "_thread_times", return_value=("-", "-")):
                                 with patch.object(acw, "_last_agent_snippet_for_pane", return_value="Ran tests"):
-                                    with patch.object(acw, "_is_pid_stopped", return_value=False):
-                                        out = io.StringIO()
-                                        with redirect_stdout(out):
-                                            acw.cmd_status([])
+                                    out = io.StringIO()
+                                    with redirect_stdout(out):
+                                        acw.cmd_status([])
         text = out.getvalue()
         self.assertIn("Sessions: 1", text)
         self.assertIn("Ran tests", text)
@@ -178,10 +240,9 @@ class WatchdUnitTests(unittest.TestCase):
                         ):
                             with patch.object(acw, "_thread_times", return_value=("-", "-")):
                                 with patch.object(acw, "_last_agent_snippet_for_pane", return_value="Ran tests"):
-                                    with patch.object(acw, "_is_pid_stopped", return_value=False):
-                                        out = io.StringIO()
-                                        with redirect_stdout(out):
-                                            acw.cmd_status([])
+                                    out = io.StringIO()
+                                    with redirect_stdout(out):
+                                        acw.cmd_status([])
         text = out.getvalue()
         self.assertIn("Recommendation: run acw doctor formal", text)
 
@@ -223,11 +284,10 @@ class WatchdUnitTests(unittest.TestCase):
                         ):
                             with patch.object(acw, "_thread_times", return_value=("-", "-")):
                                 with patch.object(acw, "_last_agent_snippet_for_pane", return_value="Ran tests"):
-                                    with patch.object(acw, "_is_pid_stopped", return_value=False):
-                                        out = io.StringIO()
-                                        with patch("builtins.__import__", side_effect=fake_import):
-                                            with redirect_stdout(out):
-                                                acw.cmd_status([])
+                                    out = io.StringIO()
+                                    with patch("builtins.__import__", side_effect=fake_import):
+                                        with redirect_stdout(out):
+                                            acw.cmd_status([])
         text = out.getvalue()
         self.assertIn("WINDOW/PANE", text)
         self.assertIn("LAST_AGENT", text)
@@ -260,6 +320,33 @@ class WatchdUnitTests(unittest.TestCase):
                 with self.assertRaises(SystemExit):
                     acw.resolve_thread_id("%1", "auto")
 
+    def test_running_pid_from_file_reads_once_and_checks_liveness(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pf = os.path.join(tmpdir, "w.pid")
+            Path(pf).write_text(f"{os.getpid()}\n", encoding="utf-8")
+            with patch.object(acw, "_read_pid_file", wraps=acw._read_pid_file) as read:
+                self.assertEqual(str(os.getpid()), acw.running_pid_from_file(pf))
+            read.assert_called_once_with(pf)
+            with patch.object(acw.os, "kill", side_effect=ProcessLookupError):
+                self.assertIsNone(acw.running_pid_from_file(pf))
+                self.assertFalse(acw.is_running_pid_file(pf))
+            self.assertIsNone(acw.running_pid_from_file(os.path.join(tmpdir, "missing.pid")))
+
+    def test_resolve_pane_from_window_target_prefers_active_pane_in_active_session(self):
+        listing = (
+            "main\t2\t%4\t0\t1\t0\t40\tedit\n"
+            "main\t2\t%5\t1\t1\t1\t50\tedit\n"
+            "other\t2\t%9\t1\t0\t0\t90\tlogs\n"
+            "main\t3\t%6\t1\t0\t0\t60\tname\twith tab\n"
+        )
+        with patch.object(acw, "run_tmux", return_value=listing) as tmux:
+            self.assertEqual("%5", acw.resolve_pane_from_window_target("2"))
+            self.assertEqual("%9", acw.resolve_pane_from_window_target("other:2"))
+            self.assertIsNone(acw.resolve_pane_from_window_target("7"))
+            self.assertEqual("%6", acw.resolve_pane_from_window_name("name\twith tab"))
+            self.assertEqual({"%4", "%5", "%6", "%9"}, set(acw._build_pane_window_map()))
+        tmux.assert_called_once()
+
     def test_resolve_start_pane_target_rejects_thread_id(self):
         err = io.StringIO()
         with redirect_stderr(err):
@@ -273,18 +360,70 @@ class WatchdUnitTests(unittest.TestCase):
 
     def test_watcher_rows_filter_to_current_tmux_socket(self):
         ps_out = (
-            "101 python3 /repo/bin/auto_continue_logwatch.py --pane %0 "
+            "101 S python3 /repo/bin/auto_continue_logwatch.py --pane %0 "
             "--thread-id 11111111-1111-1111-1111-111111111111 --tmux-socket /tmp/other.sock\n"
-            "202 python3 /repo/bin/auto_continue_logwatch.py --pane %0 "
+            "202 S python3 /repo/bin/auto_continue_logwatch.py --pane %0 "
             "--thread-id 22222222-2222-2222-2222-222222222222 --tmux-socket /tmp/current.sock\n"
         )
         with patch.dict(acw.os.environ, {"AUTO_CONTINUE_TMUX_SOCKET": "/tmp/current.sock"}, clear=False):
-            with patch.object(acw.subprocess, "check_output", return_value=ps_out):
-                rows = acw.watcher_rows()
+            with patch.object(acw, "_WATCHER_PS_OUT", None):
+                with patch.object(acw.subprocess, "check_output", return_value=ps_out):
+                    rows = acw.watcher_rows()
         self.assertEqual(1, len(rows))
         self.assertEqual("202", rows[0]["pid"])
         self.assertEqual("/tmp/current.sock", rows[0]["tmux_socket"])
 
+    def test_watcher_rows_requires_python_interpreter_token(self):
+        ps_out = (
+            "1 Ss /sbin/init\n"
+            "101 S+ vim /repo/bin/auto_continue_logwatch.py --pane %1\n"
+            "102 Tl /usr/bin/python3.11 /repo/bin/auto_continue_logwatch.py --pane %2\n"
+            "103 S pythonista /repo/bin/auto_continue_logwatch.py --pane %3\n"
+        )
+        with patch.dict(acw.os.environ, {"AUTO_CONTINUE_TMUX_SOCKET": ""}, clear=False):
+            with patch.object(acw, "_preferred_tmux_socket", return_value=""):
+                with patch.object(acw, "_WATCHER_PS_OUT", None):
+                    with patch.object(acw.subprocess, "check_output", return_value=ps_out) as ps:
+                        rows = acw.watcher_rows()
+        self.assertEqual(["102"], [r["pid"] for r in rows])
+        self.assertEqual("Tl", rows[0]["proc_state"])
+        self.assertEqual(["-u", str(os.getuid())], ps.call_args.args[0][2:4])
+
+    def test_watcher_rows_reuses_scan_until_a_watcher_is_signalled(self):
+        ps_out = "102 S python3 /repo/bin/auto_continue_logwatch.py --pane %2\n"
+        with patch.object(acw, "_preferred_tmux_socket", return_value=""):
+            with patch.object(acw, "_WATCHER_PS_OUT", None):
+                with patch.object(acw.subprocess, "check_output", return_value=ps_out) as ps:
+                    self.assertEqual(["102"], acw.watcher_pids_for_pane("%2"))
+                    self.assertEqual([], acw.watcher_rows("%9"))
+                    self.assertEqual(1, ps.call_count)
+                    acw._signal_pid(os.getpid(), 0)
+                    acw.watcher_rows()
+                    self.assertEqual(2, ps.call_count)
+
+    def test_status_details_reads_last_event_from_log_tail(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            watch = os.path.join(tmpdir, "watch.log")
+            with open(watch, "w", encoding="utf-8") as f:
+                f.write("x" * 200_000 + "\n")
+                f.write("[12:00:00] continue: sent turn=t1\n")
+            row = {"pid": "7", "proc_state": "S", "thread": THREAD, "watch": watch, "state": "",
+                   "msg_file": "", "msg_inline": "go"}
+            out = io.StringIO()
+            with patch.object(acw, "_thread_times", return_value=("-", "-")):
+                with patch.object(acw, "_last_agent_snippet_for_pane", return_value=""):
+                    with patch.object(acw, "_read_session_state", return_value={}):
+                        with patch.object(acw, "_print_status_recommendations"):
+                            with redirect_stdout(out):
+                                acw._status_details([(row, "%7", "0:7:formal")])
+        self.assertIn("LAST_EVENT:      [12:00:00] continue: sent turn=t1", out.getvalue())
+
+    def test_compute_state_uses_state_from_ps_scan(self):
+        with patch.object(acw.subprocess, "check_output") as probe:
+            self.assertEqual("paused", acw._compute_state({"pid": "7", "proc_state": "T"}, {}))
+            self.assertEqual("running", acw._compute_state({"pid": "7", "proc_state": "Sl"}, {}))
+        probe.assert_not_called()
+
     def test_doctor_checks_current_pane_and_thread(self):
         with patch.dict(acw.os.environ, {"TMUX_PANE": "%7"}, clear=False):
             with patch.object(acw, "_state_dir_is_writable", return_value=(True, acw.STATE_DIR)):
@@ -358,13 +497,14 @@ class WatchdUnitTests(unittest.TestCase):
         self.assertIn("error:could not resolve target '.'", rendered)
 
     def test_load_sessions_reads_thread_keyed_state(self):
-        session_file = f"/state/acw_session.{THREAD}.json"
-        with patch.object(acw.glob, "glob", return_value=[session_file]):
-            with patch("builtins.open", mock_open(read_data=json.dumps({
+        with tempfile.TemporaryDirectory() as tmpdir:
+            session_file = os.path.join(tmpdir, f"acw_session.{THREAD}.json")
+            Path(session_file).write_text(json.dumps({
                 "thread_id": THREAD,
                 "name": "aot",
                 "message": "continue",
-            }))):
+            }), encoding="utf-8")
+            with patch.object(acw, "STATE_DIR", tmpdir):
                 sessions = acw._load_sessions()
         self.assertEqual(1, len(sessions))
         self.assertEqual("aot", sessions[0]["name"])
@@ -372,14 +512,43 @@ class WatchdUnitTests(unittest.TestCase):
         self.assertEqual(session_file, sessions[0]["state_file"])
 
     def test_load_sessions_ignores_invalid_thread_ids(self):
-        with patch.object(acw.glob, "glob", return_value=["/state/acw_session.bad.json"]):
-            with patch("builtins.open", mock_open(read_data=json.dumps({
+        with tempfile.TemporaryDirectory() as tmpdir:
+            session_file = os.path.join(tmpdir, "acw_session.bad.json")
+            Path(session_file).write_text(json.dumps({
                 "thread_id": "bad",
                 "name": "oops",
-            }))):
+            }), encoding="utf-8")
+            with patch.object(acw, "STATE_DIR", tmpdir):
                 sessions = acw._load_sessions()
         self.assertEqual([], sessions)
 
+    def test_read_json_file_reparses_only_after_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, f"acw_session.{THREAD}.json")
+            Path(path).write_text(json.dumps({"thread_id": THREAD}), encoding="utf-8")
+            os.utime(path, (100, 100))
+            with patch.object(acw, "_JSON_FILE_CACHE", {}):
+                first = acw._read_json_file(path)
+                first["name"] = "mutated"
+                with patch.object(acw.json, "loads", side_effect=AssertionError("reparsed")):
+                    self.assertEqual({"thread_id": THREAD}, acw._read_json_file(path))
+                Path(path).write_text(json.dumps({"thread_id": THREAD, "name": "aot"}), encoding="utf-8")
+                self.assertEqual("aot", acw._read_json_file(path)["name"])
+                self.assertEqual({}, acw._read_json_file(os.path.join(tmpdir, "missing.json")))
+
+    def test_read_json_file_does_not_cache_a_file_written_within_a_tick(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, f"acw_session.{THREAD}.json")
+            Path(path).write_text(json.dumps({"name": "aaa"}), encoding="utf-8")
+            with patch.object(acw, "_JSON_FILE_CACHE", {}):
+                self.assertEqual("aaa", acw._read_json_file(path)["name"])
+                st = os.stat(path)
+                # A same-size rewrite whose stat stamp is unchanged (as on a
+                # coarse-timestamp filesystem with a reused inode) is still seen.
+                Path(path).write_text(json.dumps({"name": "bbb"}), encoding="utf-8")
+                with patch.object(acw.os, "stat", return_value=st):
+                    self.assertEqual("bbb", acw._read_json_file(path)["name"])
+
     def test_window_renamed_hook_updates_session_name(self):
         def fake_tmux(*args):
             if args[:3] == ("list-panes", "-t", "@3"):
@@ -393,41 +562,69 @@ class WatchdUnitTests(unittest.TestCase):
 
         write_state.assert_called_once_with(THREAD, {"thread_id": THREAD, "name": "new-name"})
 
+    def test_write_session_state_merges_compactly_and_skips_noop_updates(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch.object(acw, "STATE_DIR", tmpdir):
+                acw._write_session_state(THREAD, {"thread_id": THREAD, "name": "aot"})
+                acw._write_session_state(THREAD, {"message": "go"})
+                path = Path(acw.state_file_for_thread(THREAD))
+                self.assertEqual(
+                    f'{{"thread_id":"{THREAD}","name":"aot","message":"go"}}',
+                    path.read_text(),
+                )
+                with patch.object(acw.tempfile, "mkstemp") as mkstemp:
+                    acw._write_session_state(THREAD, {"name": "aot"})
+                mkstemp.assert_not_called()
+
     def test_cleanup_rejects_target(self):
         with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
             with self.assertRaises(SystemExit):
                 acw.cmd_cleanup(["aot"])
 
     def test_cleanup_stale_files_removes_dead_session_state(self):
-        session_file = f"/state/acw_session.{THREAD}.json"
-
-        def fake_glob(pattern):
-            if pattern.endswith("auto_continue_logwatch.*.pid"):
-                return []
-            if pattern.endswith("auto_continue_logwatch*.log"):
-                return []
-            if pattern.endswith("auto_continue_logwatch*.runner.log"):
-                return []
-            if pattern.endswith("acw_session.*.json"):
-                return [session_file]
-            return []
-
-        with patch.object(acw.glob, "glob", side_effect=fake_glob):
-            with patch.object(acw, "watcher_rows", return_value=[]):
-                with patch.object(acw.Path, "unlink") as unlink:
-                    acw.cleanup_stale_files()
-        unlink.assert_called_once_with(missing_ok=True)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            names = [
+                f"acw_session.{THREAD}.json",
+                "auto_continue_logwatch.w1.pid",
+                "auto_continue_logwatch.w1.log",
+                "auto_continue_logwatch.w1.runner.log",
+                "auto_continue_logwatch.live.log",
+                "auto_continue_logwatch.live.runner.log",
+                "unrelated.txt",
+            ]
+            for name in names:
+                Path(tmpdir, name).write_text("", encoding="utf-8")
+            rows = [{"pane": "%live", "thread": ""}]
+            with patch.object(acw, "STATE_DIR", tmpdir):
+                with patch.object(acw, "is_running_pid_file", return_value=False):
+                    with patch.object(acw, "watcher_rows", return_value=rows):
+                        with patch.object(acw, "key_from_pane", return_value="live"):
+                            acw.cleanup_stale_files()
+            remaining = sorted(os.listdir(tmpdir))
+        self.assertEqual(
+            remaining,
+            [
+                "auto_continue_logwatch.live.log",
+                "auto_continue_logwatch.live.runner.log",
+                "unrelated.txt",
+            ],
+        )
 
     def test_build_thread_pane_map_uses_tmux_process_tree(self):
         def fake_tmux(*args):
-            if args[:4] == ("list-panes", "-a", "-F", "#{pane_id}\t#{pane_pid}"):
-                return "%7\t1234\n"
+            if args[:4] == ("list-panes", "-a", "-F", acw._PANE_ROW_FORMAT):
+                return "main\t1\t%7\t1\t1\t0\t1234\tcodex\n"
             return None
 
+        children = {"1": ["1234", "1300"], "1234": ["1240"], "1240": ["1250"]}
         with patch.object(acw, "run_tmux", side_effect=fake_tmux):
-            with patch.object(acw, "_threads_from_pstree", return_value=[THREAD]):
-                mapping = acw._build_thread_pane_map()
-        self.assertEqual("%7", mapping[THREAD])
+            with patch.object(acw, "process_children", return_value=children) as ps:
+                with patch.object(
+                    acw, "_thread_from_codex_pid", side_effect=lambda pid: THREAD if pid == "1250" else None
+                ):
+                    mapping = acw._build_thread_pane_map()
+        self.assertEqual({THREAD: "%7"}, mapping)
+        ps.assert_called_once()
 
     def test_run_tmux_avoids_cross_server_fallback_when_client_healthy(self):
         with patch.dict(acw.os.environ, {"TMUX": "/tmp/tmux-1/default,1,0"}, clear=False):
@@ -441,6 +638,16 @@ class WatchdUnitTests(unittest.TestCase):
         self.assertIsNone(out)
         self.assertGreaterEqual(chk.call_count, 1)
 
+    def test_tmux_client_health_is_probed_once_per_tmux_env(self):
+        with patch.object(acw, "_TMUX_CLIENT_HEALTH", {}):
+            with patch.dict(acw.os.environ, {"TMUX": "/tmp/tmux-1/default,1,0"}, clear=False):
+                with patch.object(acw.subprocess, "check_output", return_value="main\n") as chk:
+                    self.assertTrue(acw._tmux_client_env_healthy())
+                    self.assertTrue(acw._tmux_client_env_healthy())
+            self.assertEqual(1, chk.call_count)
+            with patch.dict(acw.os.environ, {"TMUX": ""}, clear=False):
+                self.assertFalse(acw._tmux_client_env_healthy())
+
     def test_run_tmux_falls_back_when_client_unhealthy(self):
         with patch.dict(acw.os.environ, {"TMUX": "/tmp/tmux-1/default,1,0"}, clear=False):
             with patch.object(acw, "_tmux_client_env_healthy", return_value=False):
@@ -536,10 +743,9 @@ class WatchdUnitTests(unittest.TestCase):
                     with patch.object(acw, "watcher_rows", return_value=live_rows):
                         with patch.object(acw, "_read_state_json", return_value={}):
                             with patch.object(acw, "_thread_times", return_value=("-", "-")):
-                                with patch.object(acw, "_is_pid_stopped", return_value=False):
-                                    out = io.StringIO()
-                                    with redirect_stdout(out):
-                                        acw.cmd_status(["--details"])
+                                out = io.StringIO()
+                                with redirect_stdout(out):
+                                    acw.cmd_status(["--details"])
         text = out.getvalue()
         self.assertIn("PANE:            %7", text)
         self.assertIn("PID:             1234", text)
@@ -573,16 +779,48 @@ class WatchdUnitTests(unittest.TestCase):
         with patch.dict(acw.os.environ, {"TMUX": "/tmp/tmux-1013/default,22,0"}, clear=False):
             self.assertEqual("/tmp/tmux-1013/default", acw._tmux_socket_from_env())
 
+    def test_editor_session_invalidates_process_and_pane_snapshots(self):
+        ps_out = "102 S python3 /repo/bin/auto_continue_logwatch.py --pane %2\n"
+        with patch.object(acw, "_preferred_tmux_socket", return_value=""):
+            with patch.object(acw.subprocess, "check_output", return_value=ps_out) as ps:
+                with patch.object(acw, "run_tmux", return_value="main\t1\t%2\t1\t1\t0\t20\tcodex\n"):
+                    acw.watcher_rows()
+                    acw._list_panes()
+                    with patch.object(acw.subprocess, "call", return_value=0):
+                        with patch.dict(acw.os.environ, {"EDITOR": "true"}, clear=False):
+                            acw._edit_message_interactive("hello")
+                    self.assertIsNone(acw._PANE_ROWS)
+                    acw.watcher_rows()
+        self.assertEqual(2, ps.call_count)
+
+    def test_signal_pid_sends_through_pidfd_or_falls_back_to_kill(self):
+        with patch.object(acw.os, "pidfd_open", return_value=42):
+            with patch.object(acw.signal, "pidfd_send_signal") as send:
+                with patch.object(acw.os, "close") as close:
+                    acw._terminate_pid(101)
+        self.assertEqual([((42, acw.signal.SIGCONT),), ((42, acw.signal.SIGTERM),)], send.call_args_list)
+        close.assert_called_once_with(42)
+
+        with patch.object(acw.os, "pidfd_open", side_effect=OSError(38, "ENOSYS")):
+            with patch.object(acw.os, "kill") as kill:
+                acw._terminate_pid(101)
+        self.assertEqual([((101, acw.signal.SIGCONT),), ((101, acw.signal.SIGTERM),)], kill.call_args_list)
+
+        with patch.object(acw.os, "pidfd_open", side_effect=ProcessLookupError):
+            with patch.object(acw.os, "kill") as kill:
+                with self.assertRaises(ProcessLookupError):
+                    acw._terminate_pid(101)
+        kill.assert_not_called()
+
     def test_pause_star_pauses_all_watchers(self):
         rows = [
-            {"pane": "%1", "pid": "101"},
-            {"pane": "%2", "pid": "202"},
+            {"pane": "%1", "pid": "101", "proc_state": "S"},
+            {"pane": "%2", "pid": "202", "proc_state": "S"},
         ]
         with patch.object(acw, "watcher_rows", return_value=rows):
-            with patch.object(acw, "_is_pid_stopped", return_value=False):
-                with patch.object(acw.os, "kill") as kill:
-                    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-                        acw.cmd_pause(["*"])
+            with patch.object(acw, "_signal_pid") as kill:
+                with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                    acw.cmd_pause(["*"])
         self.assertEqual(
             [
                 ((101, acw.signal.SIGSTOP),),
@@ -591,16 +829,40 @@ class WatchdUnitTests(unittest.TestCase):
             kill.call_args_list,
         )
 
+    def test_pause_signals_every_watcher_before_reporting(self):
+        rows = [
+            {"pane": "%1", "pid": "101", "proc_state": "T"},
+            {"pane": "%1", "pid": "102", "proc_state": "S"},
+            {"pane": "%1", "pid": "103", "proc_state": "S"},
+        ]
+        out = io.StringIO()
+        err = io.StringIO()
+
+        def fake_signal(pid, sig):
+            self.assertEqual("", out.getvalue())
+            if pid == 103:
+                raise PermissionError("denied")
+
+        with patch.object(acw, "resolve_pane_target", return_value="%1"):
+            with patch.object(acw, "watcher_rows", return_value=rows):
+                with patch.object(acw, "_signal_pid", side_effect=fake_signal):
+                    with redirect_stdout(out), redirect_stderr(err):
+                        acw.cmd_pause(["%1"])
+        self.assertEqual(
+            "already paused: pane=%1 pid=101\npaused: pane=%1 pid=102\n",
+            out.getvalue(),
+        )
+        self.assertEqual("error: could not pause pid=103: denied\n", err.getvalue())
+
     def test_resume_star_resumes_all_paused_watchers(self):
         rows = [
-            {"pane": "%1", "pid": "101"},
-            {"pane": "%2", "pid": "202"},
+            {"pane": "%1", "pid": "101", "proc_state": "T"},
+            {"pane": "%2", "pid": "202", "proc_state": "S"},
         ]
         with patch.object(acw, "watcher_rows", return_value=rows):
-            with patch.object(acw, "_is_pid_stopped", side_effect=[True, False]):
-                with patch.object(acw.os, "kill") as kill:
-                    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-                        acw.cmd_resume(["*"])
+            with patch.object(acw, "_signal_pid") as kill:
+                with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                    acw.cmd_resume(["*"])
         kill.assert_called_once_with(101, acw.signal.SIGCONT)
 
     def test_restart_star_restarts_all_live_panes(self):
@@ -643,6 +905,35 @@ class WatchdUnitTests(unittest.TestCase):
                         acw.cmd_restart([])
         restart_panes.assert_called_once_with(["%1", "%2"])
 
+    def test_restart_panes_checks_liveness_with_one_list_panes(self):
+        listing = "main\t1\t%1\t1\t1\t0\t111\tcodex\n"
+        with patch.object(acw, "run_tmux", return_value=listing) as tmux:
+            with patch.object(acw, "stop_pane_watchers") as stop:
+                with patch.object(acw, "_restart_one") as restart_one:
+                    with redirect_stdout(io.StringIO()):
+                        acw._restart_panes(["%1", "%2"])
+        tmux.assert_called_once()
+        restart_one.assert_called_once_with("%1", "%1", [])
+        stop.assert_called_once_with("%2")
+
+    def test_rename_hook_is_installed_once_per_invocation(self):
+        with patch.object(acw, "run_tmux", side_effect=[None, "", ""]) as tmux:
+            acw.ensure_tmux_window_rename_hook()
+            acw.ensure_tmux_window_rename_hook()
+            acw.ensure_tmux_window_rename_hook()
+        self.assertEqual(2, tmux.call_count)
+        self.assertEqual(("set-hook", "-g", "window-renamed"), tmux.call_args.args[:3])
+
+    def test_restart_one_detects_thread_once(self):
+        tid = "019c0000-0000-7000-8000-000000000001"
+        with patch.object(acw, "detect_thread_id_for_pane", return_value=tid) as detect:
+            with patch.object(acw, "_read_session_state", return_value={"message": "go on"}):
+                with patch.object(acw, "stop_pane_watchers"):
+                    with patch.object(acw, "cmd_start") as start:
+                        acw._restart_one("%1", "%1", [])
+        detect.assert_called_once_with("%1")
+        start.assert_called_once_with(["%1", tid, "--message", "go on"])
+
 
 if __name__ == "__main__":
     unittest.main()